@@ -0,0 +1,181 @@
+"""
+Admission Control - global and per-host scan concurrency with a bounded wait queue
+Scans wait for a slot instead of piling browsers onto the box; full queues are rejected
+"""
+
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+# Admission outcomes, reported in AdmissionRejected.reason and stats()
+REJECT_QUEUE_FULL = 'queue_full'
+REJECT_TIMEOUT = 'timeout'
+
+# How often memory-blocked waiters re-check browser RSS
+MEMORY_POLL_SECONDS = 0.5
+
+
+class AdmissionRejected(Exception):
+    """Raised when a scan cannot be admitted; retry_after is a suggested delay in seconds"""
+
+    def __init__(self, reason: str, retry_after: int, message: str):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Limits scans globally and per target host.
+
+    At most ``max_concurrent`` scans run at once and at most ``max_per_host``
+    against one host. Up to ``max_waiting`` further scans wait, each for at
+    most ``max_wait`` seconds; anything beyond that is rejected. When
+    ``memory_limit_mb`` is set, a scan is only started while ``memory_fn()``
+    (current browser RSS in bytes) leaves room for ``mb_per_scan`` more,
+    except that one scan may always run.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 4,
+        max_per_host: int = 2,
+        max_waiting: int = 20,
+        max_wait: float = 30.0,
+        memory_limit_mb: int = 0,
+        mb_per_scan: int = 200,
+        memory_fn: Optional[Callable[[], int]] = None,
+    ):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_per_host = max(1, max_per_host)
+        self.max_waiting = max_waiting
+        self.max_wait = max_wait
+        self.memory_limit_bytes = memory_limit_mb * 1024 * 1024
+        self.scan_bytes = mb_per_scan * 1024 * 1024
+        self.memory_fn = memory_fn
+
+        self._cond: Optional[asyncio.Condition] = None
+        self._running = 0
+        self._waiting = 0
+        self._waiting_unbounded = 0
+        self._hosts: Dict[str, int] = {}
+        self._admitted = 0
+        self._rejected = {REJECT_QUEUE_FULL: 0, REJECT_TIMEOUT: 0}
+        self._memory_waits = 0
+        self._avg_scan_seconds = 10.0
+
+    @property
+    def cond(self) -> asyncio.Condition:
+        # Created lazily so the condition binds to the running event loop
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free, from the running average scan time"""
+        rounds = math.ceil((self._waiting + 1) / self.max_concurrent)
+        return max(1, min(300, math.ceil(rounds * self._avg_scan_seconds)))
+
+    def _reject(self, reason: str, message: str) -> AdmissionRejected:
+        self._rejected[reason] += 1
+        return AdmissionRejected(reason, self.retry_after(), message)
+
+    def _has_slot(self, host: str) -> bool:
+        return self._running < self.max_concurrent and self._hosts.get(host, 0) < self.max_per_host
+
+    async def _memory_allows(self) -> bool:
+        if not self.memory_limit_bytes or self.memory_fn is None or self._running == 0:
+            return True
+        rss = await asyncio.to_thread(self.memory_fn)
+        return rss + self.scan_bytes <= self.memory_limit_bytes
+
+    async def _acquire(self, host: str, deadline: Optional[float]) -> None:
+        loop = asyncio.get_running_loop()
+        memory_blocked = False
+        async with self.cond:
+            while True:
+                if self._has_slot(host):
+                    if await self._memory_allows():
+                        break
+                    if not memory_blocked:
+                        memory_blocked = True
+                        self._memory_waits += 1
+                    poll = MEMORY_POLL_SECONDS
+                else:
+                    poll = None
+                if deadline is not None:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise self._reject(REJECT_TIMEOUT, f"No scan slot became free within {self.max_wait:g}s")
+                    poll = remaining if poll is None else min(poll, remaining)
+                try:
+                    await asyncio.wait_for(self.cond.wait(), poll)
+                except asyncio.TimeoutError:
+                    pass
+            self._running += 1
+            self._hosts[host] = self._hosts.get(host, 0) + 1
+            self._admitted += 1
+
+    async def _release(self, host: str, started: float) -> None:
+        elapsed = time.monotonic() - started
+        self._avg_scan_seconds = 0.8 * self._avg_scan_seconds + 0.2 * elapsed
+        async with self.cond:
+            self._running -= 1
+            self._hosts[host] -= 1
+            if not self._hosts[host]:
+                del self._hosts[host]
+            self.cond.notify_all()
+
+    def check_capacity(self, host: str) -> None:
+        """Raise AdmissionRejected right away if a scan for host could not even queue"""
+        if not self._has_slot(host) and self._waiting >= self.max_waiting:
+            raise self._reject(REJECT_QUEUE_FULL, f"Scan queue is full ({self.max_waiting} scans waiting)")
+
+    @asynccontextmanager
+    async def slot(self, host: str, bounded: bool = True) -> AsyncIterator[None]:
+        """
+        Hold a scan slot for ``host`` for the duration of the block.
+
+        ``bounded=False`` waits without a deadline and outside the wait-queue
+        limit, for callers such as the job queue that bound themselves.
+        """
+        if bounded:
+            self.check_capacity(host)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait if bounded else None
+        if bounded:
+            self._waiting += 1
+        else:
+            self._waiting_unbounded += 1
+        try:
+            await self._acquire(host, deadline)
+        finally:
+            if bounded:
+                self._waiting -= 1
+            else:
+                self._waiting_unbounded -= 1
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            await asyncio.shield(self._release(host, started))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': self._running,
+            'waiting': self._waiting,
+            'waiting_jobs': self._waiting_unbounded,
+            'max_concurrent': self.max_concurrent,
+            'max_per_host': self.max_per_host,
+            'max_waiting': self.max_waiting,
+            'busiest_host_scans': max(self._hosts.values(), default=0),
+            'admitted': self._admitted,
+            'rejected': dict(self._rejected),
+            'memory_limit_mb': self.memory_limit_bytes // (1024 * 1024),
+            'memory_waits': self._memory_waits,
+            'avg_scan_seconds': round(self._avg_scan_seconds, 2),
+        }
@@ -0,0 +1,172 @@
+"""
+Batch Scan - shards many scans across worker processes that each own their browsers
+Sizes the process pool per batch from CPU count and available memory so batches cannot overcommit the box
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.util import Finalize
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import psutil
+
+# (succeeded, result dict or error message) per scanned request
+BatchOutcome = Tuple[bool, Any]
+
+# Event loop owned by a worker process; its browser pool lives on it across chunks
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _init_worker(scans_per_process: int) -> None:
+    """Worker process initializer: size the browser pool, load tracker lists and create the event loop"""
+    global _worker_loop
+    # One browser per concurrent scan, as mb_per_scan assumes
+    os.environ['SCANNER_POOL_SIZE'] = str(scans_per_process)
+    os.environ['SCANNER_POOL_CONTEXTS_PER_BROWSER'] = '1'
+    import main
+    # The worker never runs the app lifespan, so load the external lists here
+    # to classify batch scans the same way as POST /scan
+    main.load_tracker_lists()
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+    Finalize(None, _shutdown_worker, exitpriority=10)
+
+
+def _shutdown_worker() -> None:
+    import main
+    try:
+        _worker_loop.run_until_complete(main.browser_pool.stop())
+        _worker_loop.run_until_complete(main.static_fetcher.close())
+    finally:
+        _worker_loop.close()
+
+
+def _scan_chunk(chunk: List[Dict[str, Any]]) -> List[BatchOutcome]:
+    """Run a chunk of scans concurrently inside a worker process"""
+    import main
+
+    async def scan_one(params: Dict[str, Any]) -> BatchOutcome:
+        try:
+            request = main.ScanRequest(**params)
+            result = await main.run_scan(str(request.url), request)
+            return True, result
+        except Exception as e:
+            return False, str(e) or e.__class__.__name__
+
+    return _worker_loop.run_until_complete(asyncio.gather(*(scan_one(params) for params in chunk)))
+
+
+class BatchScanner:
+    """
+    Process pool for batch scans.
+
+    Each worker runs up to ``scans_per_process`` scans at once on its own
+    browser pool, so at most processes * scans_per_process scans run globally.
+    The process count is the smaller of the CPU count, ``max_processes`` and
+    what available memory allows at ``mb_per_scan`` per concurrent scan, after
+    setting aside ``reserved_bytes()`` (memory other scanners in this process,
+    such as the API's own browser pool, may still grow into). It is planned
+    again at the start of every batch that finds the pool idle.
+    """
+
+    def __init__(
+        self,
+        scans_per_process: int = 2,
+        mb_per_scan: int = 400,
+        max_processes: Optional[int] = None,
+        reserved_bytes: Optional[Callable[[], int]] = None
+    ):
+        self.scans_per_process = max(1, scans_per_process)
+        self.mb_per_scan = mb_per_scan
+        self.max_processes = max_processes
+        self.reserved_bytes = reserved_bytes
+        self.processes = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._restarts = 0
+        self._replans = 0
+
+    def plan_processes(self) -> int:
+        """Number of worker processes the box can afford right now"""
+        available = psutil.virtual_memory().available
+        if self.reserved_bytes is not None:
+            available -= self.reserved_bytes()
+        available_mb = max(0, available) // (1024 * 1024)
+        by_memory = available_mb // (self.mb_per_scan * self.scans_per_process)
+        processes = min(os.cpu_count() or 1, by_memory)
+        if self.max_processes:
+            processes = min(processes, self.max_processes)
+        return max(1, int(processes))
+
+    def _get_executor(self, processes: int) -> ProcessPoolExecutor:
+        if self._executor is not None and processes != self.processes and not self._in_flight:
+            # Idle pool sized for different conditions; workers close their browsers on exit
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            self._replans += 1
+        if self._executor is None:
+            self.processes = processes
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.scans_per_process,),
+            )
+        return self._executor
+
+    def _reset_executor(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._restarts += 1
+
+    async def _run_chunk(self, executor: ProcessPoolExecutor, chunk: List[Dict[str, Any]]) -> List[BatchOutcome]:
+        loop = asyncio.get_running_loop()
+        self._in_flight += len(chunk)
+        try:
+            return await loop.run_in_executor(executor, _scan_chunk, chunk)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); fail this chunk and start a fresh pool next time
+            if self._executor is executor:
+                self._reset_executor()
+            return [(False, 'Scan worker process crashed')] * len(chunk)
+        finally:
+            self._in_flight -= len(chunk)
+
+    async def run(self, requests: List[Dict[str, Any]]) -> List[BatchOutcome]:
+        """Scan every request and return outcomes in input order"""
+        executor = self._get_executor(await asyncio.to_thread(self.plan_processes))
+        chunks = [
+            requests[i:i + self.scans_per_process]
+            for i in range(0, len(requests), self.scans_per_process)
+        ]
+        chunk_outcomes = await asyncio.gather(*(self._run_chunk(executor, chunk) for chunk in chunks))
+        outcomes = [outcome for chunk in chunk_outcomes for outcome in chunk]
+        for ok, _ in outcomes:
+            if ok:
+                self._completed += 1
+            else:
+                self._failed += 1
+        return outcomes
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'processes': self.processes,
+            'scans_per_process': self.scans_per_process,
+            'max_concurrent_scans': self.processes * self.scans_per_process,
+            'in_flight': self._in_flight,
+            'completed': self._completed,
+            'failed': self._failed,
+            'pool_restarts': self._restarts,
+            'pool_replans': self._replans,
+        }
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Classifier micro-benchmark - indexed TrackerClassifier vs the original linear substring scan
+
+Usage: python benchmarks/bench_classifier.py [--list-size 100000] [--lookups 200000]
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tracker_classifier import DEFAULT_LIST_ENTRY, KNOWN_TRACKERS, TrackerClassifier
+
+
+def linear_classify(trackers, domain: str, resource_type: str):
+    """The pre-index implementation: substring test against every known domain"""
+    domain_lower = domain.lower()
+    for known_domain, info in trackers.items():
+        if known_domain in domain_lower:
+            return info['risk'], info.get('category', 'general')
+    return None
+
+
+def random_domain(rng: random.Random) -> str:
+    label = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 12)))
+    return f"{label}.{rng.choice(['com', 'net', 'io', 'org', 'co.uk'])}"
+
+
+def build_hosts(rng: random.Random, listed, count: int):
+    """Mix of listed hosts, subdomains of listed hosts and unlisted hosts"""
+    hosts = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.3:
+            hosts.append(rng.choice(listed))
+        elif roll < 0.6:
+            hosts.append(f"cdn{rng.randint(1, 9)}.{rng.choice(listed)}")
+        else:
+            hosts.append(random_domain(rng))
+    # Page resources repeat the same hosts heavily; model that with a bounded working set
+    working_set = hosts[:2000]
+    return [rng.choice(working_set) for _ in range(count)]
+
+
+def bench(label: str, fn, hosts) -> float:
+    start = time.perf_counter()
+    for host in hosts:
+        fn(host)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<42} {elapsed * 1000:10.1f} ms  {elapsed / len(hosts) * 1e9:10.0f} ns/lookup")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--list-size', type=int, default=100000, help='synthetic external list size')
+    parser.add_argument('--lookups', type=int, default=200000, help='number of host lookups')
+    parser.add_argument('--linear-lookups', type=int, default=2000, help='lookups for the slow linear scan')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    external = {random_domain(rng): DEFAULT_LIST_ENTRY for _ in range(args.list_size)}
+    combined = dict(external)
+    combined.update(KNOWN_TRACKERS)
+    listed = list(combined)
+
+    hosts = build_hosts(rng, listed, args.lookups)
+
+    start = time.perf_counter()
+    classifier = TrackerClassifier(KNOWN_TRACKERS)
+    classifier.add_many(external.items(), overwrite=False)
+    print(f"Indexed {len(classifier)} domains in {(time.perf_counter() - start) * 1000:.1f} ms\n")
+
+    print(f"Built-in list ({len(KNOWN_TRACKERS)} domains)")
+    builtin = TrackerClassifier(KNOWN_TRACKERS)
+    bench('  linear substring scan', lambda h: linear_classify(KNOWN_TRACKERS, h, 'script'), hosts)
+    bench('  indexed classify (cold memo)', lambda h: builtin._classify_uncached(h, 'script'), hosts)
+    bench('  indexed classify (memoized)', lambda h: builtin.classify(h, 'script'), hosts)
+
+    print(f"\nExternal list ({len(combined)} domains)")
+    linear_hosts = hosts[:args.linear_lookups]
+    bench(f'  linear substring scan ({len(linear_hosts)} lookups)',
+          lambda h: linear_classify(combined, h, 'script'), linear_hosts)
+    bench('  indexed classify (cold memo)', lambda h: classifier._classify_uncached(h, 'script'), hosts)
+    bench('  indexed classify (memoized)', lambda h: classifier.classify(h, 'script'), hosts)
+    print(f"\nMemo cache: {classifier.cache_info()}")
+
+    # Sanity: label-boundary matching no longer misclassifies look-alike hosts
+    assert linear_classify(KNOWN_TRACKERS, 'notfacebook.com', 'script') is not None
+    assert builtin.classify('notfacebook.com', 'script').matched_domain is None
+    assert builtin.classify('connect.facebook.net', 'script').category == 'social'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Scan benchmark - end-to-end scans against a local synthetic web with known third parties
+
+Serves generated sites (site-N.localhost) embedding scripts, pixels and iframes
+from fake third-party hosts (tp-N.localhost) and setting first-party cookies,
+all from one local HTTP server. Runs the scanner at each depth x concurrency
+combination and writes one JSON document with scans/sec, latency percentiles,
+peak RSS and detection accuracy against the generated ground truth.
+
+Usage: python benchmarks/bench_scan.py [--mode static] [--depths 1,2] [--concurrency 1,4] [--output run.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Set, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep scanner logs out of the machine-readable output
+os.environ.setdefault('LOG_LEVEL', 'error')
+
+import psutil
+
+SCHEMA_VERSION = 1
+THIRD_PARTY_CATEGORIES = ('advertising', 'analytics', 'social', 'tracking')
+PIXEL_GIF = bytes.fromhex('47494638396101000100800000000000ffffff21f90401000000002c00000000010001000002024401003b')
+FILLER_TEXT = 'Synthetic server-rendered paragraph for the scanner benchmark. ' * 6
+
+# (resource type, url) as the scanner reports it
+ResourceKey = Tuple[str, str]
+
+
+def resolve_localhost_aliases() -> None:
+    """Resolve *.localhost to loopback in this process, as browsers already do"""
+    getaddrinfo = socket.getaddrinfo
+
+    def patched(host, *args, **kwargs):
+        name = host.decode('ascii') if isinstance(host, bytes) else host
+        if isinstance(name, str) and name.endswith('.localhost'):
+            host = '127.0.0.1'
+        return getaddrinfo(host, *args, **kwargs)
+
+    socket.getaddrinfo = patched
+
+
+@dataclass
+class SyntheticWeb:
+    """Deterministic generator for the benchmark's sites, pages and ground truth"""
+    port: int
+    sites: int = 20
+    scripts: int = 8
+    pixels: int = 4
+    iframes: int = 2
+    cookies: int = 3
+    third_parties: int = 50
+    links: int = 2
+    seed: int = 1
+
+    def site_host(self, site: int) -> str:
+        return f"site-{site}.localhost"
+
+    def third_party_host(self, index: int) -> str:
+        return f"tp-{index}.localhost"
+
+    def origin(self, host: str) -> str:
+        return f"http://{host}:{self.port}"
+
+    def site_url(self, site: int) -> str:
+        return self.origin(self.site_host(site)) + '/'
+
+    def tracker_list(self) -> Dict[str, Dict[str, str]]:
+        """Classifier entries for every fake third party"""
+        return {
+            self.third_party_host(i): {'risk': 'high', 'category': THIRD_PARTY_CATEGORIES[i % len(THIRD_PARTY_CATEGORIES)]}
+            for i in range(self.third_parties)
+        }
+
+    def expected_category(self, url: str) -> str:
+        host = url.split('://', 1)[1].split('/', 1)[0].split(':', 1)[0]
+        return self.tracker_list()[host]['category']
+
+    def page(self, host: str, path: str) -> Dict[str, List[str]]:
+        """Third-party URLs and same-site links of one page"""
+        rng = random.Random(f"{self.seed}|{host}|{path}")
+
+        def third_party(prefix: str, index: int, suffix: str) -> str:
+            tp_host = self.third_party_host(rng.randrange(self.third_parties))
+            return f"{self.origin(tp_host)}/{prefix}/{rng.randrange(4 * self.third_parties)}-{index}{suffix}"
+
+        base = path.rstrip('/')
+        return {
+            'scripts': [third_party('js', i, '.js') for i in range(self.scripts)],
+            'pixels': [third_party('pixel', i, '.gif') for i in range(self.pixels)],
+            'iframes': [third_party('frame', i, '.html') for i in range(self.iframes)],
+            'links': [f"{base}/p{i}" for i in range(self.links)],
+        }
+
+    def render(self, host: str, path: str) -> bytes:
+        page = self.page(host, path)
+        parts = ['<!doctype html><html><head><title>Benchmark page</title>']
+        parts += [f'<script src="{src}"></script>' for src in page['scripts']]
+        parts.append(f'</head><body><h1>{host}{path}</h1><p>{FILLER_TEXT}</p>')
+        parts += [f'<img src="{src}" width="1" height="1" alt="">' for src in page['pixels']]
+        parts += [f'<iframe src="{src}"></iframe>' for src in page['iframes']]
+        parts += [f'<a href="{link}">{link}</a>' for link in page['links']]
+        parts.append('</body></html>')
+        return ''.join(parts).encode('utf-8')
+
+    def ground_truth(self, site: int, depth: int, max_pages_per_level: int) -> Set[ResourceKey]:
+        """Resources a scan of site to depth should find, following the crawler's BFS limits"""
+        host = self.site_host(site)
+        expected: Set[ResourceKey] = set()
+        expected.update(('cookie', f"cookie://{host}/bench_{i}") for i in range(self.cookies))
+        level = ['/']
+        for current_depth in range(1, depth + 1):
+            next_level = []
+            for path in level:
+                page = self.page(host, path)
+                expected.update(('script', url) for url in page['scripts'])
+                expected.update(('pixel', url) for url in page['pixels'])
+                expected.update(('iframe', url) for url in page['iframes'])
+                next_level.extend(page['links'])
+            level = next_level[:max_pages_per_level]
+        return expected
+
+
+def make_handler(web: SyntheticWeb, latency: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out in separate writes; with Nagle on, the body
+        # waits for the client's delayed ACK (~40 ms) on every keep-alive response
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            host = (self.headers.get('Host') or '').split(':', 1)[0]
+            path = self.path.split('?', 1)[0]
+            headers = []
+            if host.startswith('tp-'):
+                if path.startswith('/js/'):
+                    body, content_type = b'/* synthetic third-party script */', 'application/javascript'
+                elif path.startswith('/pixel/'):
+                    body, content_type = PIXEL_GIF, 'image/gif'
+                elif path.startswith('/frame/'):
+                    body, content_type = b'<!doctype html><html><body>embed</body></html>', 'text/html; charset=utf-8'
+                else:
+                    return self.respond(404, b'', 'text/plain', [])
+            elif host.startswith('site-') and not path.startswith('/favicon'):
+                body, content_type = web.render(host, path), 'text/html; charset=utf-8'
+                headers = [('Set-Cookie', f"bench_{i}={i}; Path=/") for i in range(web.cookies)]
+            else:
+                return self.respond(404, b'', 'text/plain', [])
+            self.respond(200, body, content_type, headers)
+
+        def respond(self, status: int, body: bytes, content_type: str, headers: List[Tuple[str, str]]):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def start_server(web_factory, latency: float) -> Tuple[ThreadingHTTPServer, SyntheticWeb]:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), None)
+    server.daemon_threads = True
+    web = web_factory(server.server_address[1])
+    server.RequestHandlerClass = make_handler(web, latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, web
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(fraction * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class RssSampler:
+    """Tracks peak RSS of this process and of the pooled Chromium process trees"""
+
+    def __init__(self, browser_pool, interval: float = 0.1):
+        self.browser_pool = browser_pool
+        self.interval = interval
+        self.peak_scanner = 0
+        self.peak_chromium = 0
+        self.peak_total = 0
+        self._process = psutil.Process()
+
+    def sample(self) -> None:
+        scanner = self._process.memory_info().rss
+        chromium = self.browser_pool.rss_bytes()
+        self.peak_scanner = max(self.peak_scanner, scanner)
+        self.peak_chromium = max(self.peak_chromium, chromium)
+        self.peak_total = max(self.peak_total, scanner + chromium)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.to_thread(self.sample)
+            await asyncio.sleep(self.interval)
+
+
+def score(web: SyntheticWeb, expected: Set[ResourceKey], resources: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Count true positives, false positives and correctly classified detections for one scan"""
+    reported = {(resource['type'], resource['url']): resource for resource in resources}
+    expected_urls = {url for _, url in expected}
+    found = expected & reported.keys()
+    categorized = sum(
+        1 for key in found
+        if key[0] == 'cookie' or reported[key]['category'] == web.expected_category(key[1])
+    )
+    return {
+        'expected': len(expected),
+        'found': len(found),
+        'reported': len(reported),
+        # Network-level duplicates of expected URLs (e.g. a pixel's image request) are not false positives
+        'false_positives': sum(1 for _, url in reported if url not in expected_urls),
+        'categorized': categorized,
+    }
+
+
+async def run_config(main, web: SyntheticWeb, args, depth: int, concurrency: int) -> Dict[str, Any]:
+    scans = [(i % web.sites) for i in range(args.scans)]
+    for site in range(min(args.warmup, web.sites)):
+        await main.run_scan(web.site_url(site), main.ScanRequest(url=web.site_url(site), depth=depth, timeout=args.timeout, mode=args.mode))
+
+    sampler = RssSampler(main.browser_pool)
+    sampler_task = asyncio.create_task(sampler.run())
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    totals = {'expected': 0, 'found': 0, 'reported': 0, 'false_positives': 0, 'categorized': 0}
+    truncated = 0
+
+    async def one(site: int) -> None:
+        nonlocal truncated
+        url = web.site_url(site)
+        request = main.ScanRequest(url=url, depth=depth, timeout=args.timeout, mode=args.mode)
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await main.run_scan(url, request)
+            except Exception as e:
+                errors[e.__class__.__name__] = errors.get(e.__class__.__name__, 0) + 1
+                return
+            latencies.append(time.perf_counter() - started)
+        truncated += bool(result['summary'].get('partial'))
+        expected = web.ground_truth(site, depth, main.CRAWL_MAX_PAGES_PER_LEVEL)
+        for name, value in score(web, expected, result['resources']).items():
+            totals[name] += value
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(site) for site in scans))
+    duration = time.perf_counter() - started
+    sampler_task.cancel()
+    await asyncio.to_thread(sampler.sample)
+
+    latencies.sort()
+    completed = len(latencies)
+    return {
+        'depth': depth,
+        'concurrency': concurrency,
+        'scans': len(scans),
+        'completed': completed,
+        'errors': errors,
+        'partial_scans': truncated,
+        'duration_s': round(duration, 3),
+        'scans_per_sec': round(completed / duration, 3) if duration else 0.0,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50) * 1000, 1),
+            'p95': round(percentile(latencies, 0.95) * 1000, 1),
+            'p99': round(percentile(latencies, 0.99) * 1000, 1),
+            'mean': round(sum(latencies) / completed * 1000, 1) if completed else 0.0,
+            'max': round(latencies[-1] * 1000, 1) if completed else 0.0,
+        },
+        'peak_rss_bytes': {
+            'scanner': sampler.peak_scanner,
+            'chromium': sampler.peak_chromium,
+            'total': sampler.peak_total,
+        },
+        'accuracy': {
+            'recall': round(totals['found'] / totals['expected'], 4) if totals['expected'] else None,
+            'precision': round(1 - totals['false_positives'] / totals['reported'], 4) if totals['reported'] else None,
+            'category_accuracy': round(totals['categorized'] / totals['found'], 4) if totals['found'] else None,
+            **totals,
+        },
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(',') if part.strip()]
+
+
+async def run(args) -> Dict[str, Any]:
+    resolve_localhost_aliases()
+
+    import browser_pool as browser_pool_module
+    import main
+
+    # Chromium resolves *.localhost itself; pin it to the IPv4 loopback the server listens on
+    browser_pool_module.CHROMIUM_ARGS.append('--host-resolver-rules=MAP *.localhost 127.0.0.1')
+
+    server, web = start_server(lambda port: SyntheticWeb(
+        port=port,
+        sites=args.sites,
+        scripts=args.scripts,
+        pixels=args.pixels,
+        iframes=args.iframes,
+        cookies=args.cookies,
+        third_parties=args.third_parties,
+        links=args.links,
+        seed=args.seed,
+    ), args.latency_ms / 1000)
+    main.tracker_classifier.add_many(web.tracker_list().items())
+
+    results = []
+    try:
+        for depth in int_list(args.depths):
+            for concurrency in int_list(args.concurrency):
+                result = await run_config(main, web, args, depth, concurrency)
+                print(
+                    f"depth={depth} concurrency={concurrency}: {result['scans_per_sec']} scans/s, "
+                    f"p50={result['latency_ms']['p50']} ms p95={result['latency_ms']['p95']} ms, "
+                    f"recall={result['accuracy']['recall']} precision={result['accuracy']['precision']}",
+                    file=sys.stderr
+                )
+                results.append(result)
+    finally:
+        await main.browser_pool.stop()
+        await main.static_fetcher.close()
+        server.shutdown()
+
+    return {
+        'schema_version': SCHEMA_VERSION,
+        'benchmark': 'scan',
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'git_commit': git_commit(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'config': {
+            'mode': args.mode,
+            'timeout': args.timeout,
+            'scans_per_config': args.scans,
+            'warmup': args.warmup,
+            'latency_ms': args.latency_ms,
+            'seed': args.seed,
+            'web': {
+                'sites': args.sites,
+                'scripts': args.scripts,
+                'pixels': args.pixels,
+                'iframes': args.iframes,
+                'cookies': args.cookies,
+                'third_parties': args.third_parties,
+                'links': args.links,
+            },
+            'scanner': {
+                'pool_size': main.browser_pool.size,
+                'crawl_concurrency': main.CRAWL_CONCURRENCY,
+                'crawl_max_pages_per_level': main.CRAWL_MAX_PAGES_PER_LEVEL,
+                'max_concurrent_scans': main.admission.max_concurrent,
+            },
+        },
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', default='full', choices=['auto', 'static', 'full'], help='scan mode under test')
+    parser.add_argument('--depths', default='1,2', help='comma-separated crawl depths')
+    parser.add_argument('--concurrency', default='1,4', help='comma-separated numbers of concurrent scans')
+    parser.add_argument('--scans', type=int, default=40, help='measured scans per depth/concurrency pair')
+    parser.add_argument('--warmup', type=int, default=2, help='unmeasured scans before each pair')
+    parser.add_argument('--timeout', type=int, default=30, help='per-scan budget in seconds')
+    parser.add_argument('--sites', type=int, default=20)
+    parser.add_argument('--scripts', type=int, default=8, help='third-party scripts per page')
+    parser.add_argument('--pixels', type=int, default=4, help='tracking pixels per page')
+    parser.add_argument('--iframes', type=int, default=2, help='third-party iframes per page')
+    parser.add_argument('--cookies', type=int, default=3, help='first-party cookies set per page')
+    parser.add_argument('--third-parties', type=int, default=50, help='number of fake third-party hosts')
+    parser.add_argument('--links', type=int, default=2, help='same-site links per page')
+    parser.add_argument('--latency-ms', type=float, default=0, help='artificial server latency per response')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(encoded + '\n')
+    else:
+        print(encoded)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,325 @@
+"""
+Browser Pool - process-lifetime pool of warm Chromium instances
+Leases isolated BrowserContexts on shared browsers and recycles or replaces browsers
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Any, List, Optional
+
+import psutil
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+
+from constants import USER_AGENT
+
+CHROMIUM_ARGS = [
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--disable-web-security',
+    '--disable-features=VizDisplayCompositor'
+]
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no browser could be leased within the lease timeout"""
+
+
+def _chromium_pids() -> set:
+    """Return pids of all Chromium processes descending from this process"""
+    pids = set()
+    for child in psutil.Process().children(recursive=True):
+        try:
+            if 'chrom' in child.name().lower():
+                pids.add(child.pid)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return pids
+
+
+def _process_tree_rss(pid: Optional[int]) -> int:
+    """Resident set size in bytes of a process and all its descendants"""
+    if pid is None:
+        return 0
+    try:
+        root = psutil.Process(pid)
+        processes = [root] + root.children(recursive=True)
+    except psutil.NoSuchProcess:
+        return 0
+
+    total = 0
+    for proc in processes:
+        try:
+            total += proc.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total
+
+
+class _PooledBrowser:
+    """A single Chromium instance owned by the pool"""
+
+    def __init__(self, browser: Browser, pid: Optional[int]):
+        self.browser = browser
+        self.pid = pid
+        self.scans = 0
+        self.baseline_rss = _process_tree_rss(pid)
+        self.crashed = False
+        # Contexts currently leased on this browser
+        self.active = 0
+        # Set once the browser is due for replacement; it takes no new leases
+        self.retiring = False
+        browser.on('disconnected', lambda _: setattr(self, 'crashed', True))
+
+    @property
+    def healthy(self) -> bool:
+        return not self.crashed and self.browser.is_connected()
+
+    def rss(self) -> int:
+        return _process_tree_rss(self.pid)
+
+    def rss_growth(self) -> int:
+        return max(0, self.rss() - self.baseline_rss)
+
+
+class BrowserPool:
+    """
+    Pool of warm Chromium browsers handing out one BrowserContext per lease.
+
+    Each browser serves up to ``contexts_per_browser`` leases at once, so the
+    pool runs ``capacity`` scans concurrently. A browser due for recycling
+    stops taking leases and is replaced once its last context is closed.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        contexts_per_browser: int = 2,
+        max_scans_per_browser: int = 50,
+        max_rss_growth_mb: int = 512,
+        lease_timeout: float = 30.0,
+        on_launch: Optional[Callable[[float], None]] = None,
+    ):
+        self.size = size
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.max_scans_per_browser = max_scans_per_browser
+        self.max_rss_growth_bytes = max_rss_growth_mb * 1024 * 1024
+        self.lease_timeout = lease_timeout
+        self.on_launch = on_launch
+
+        self._playwright: Optional[Playwright] = None
+        self._browsers: List[_PooledBrowser] = []
+        self._cond: Optional[asyncio.Condition] = None
+        self._launch_lock = asyncio.Lock()
+        self._start_lock = asyncio.Lock()
+        self._background: set = set()
+        self._started = False
+
+        self._waiting = 0
+        self._leases = 0
+        self._lease_wait_total = 0.0
+        self._lease_wait_max = 0.0
+        self._lease_timeouts = 0
+        self._recycles = 0
+        self._crashes = 0
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    @property
+    def capacity(self) -> int:
+        """Number of contexts the pool can lease at once"""
+        return self.size * self.contexts_per_browser
+
+    async def start(self) -> None:
+        """Launch the playwright driver and fill the pool"""
+        async with self._start_lock:
+            if self._started:
+                return
+            self._playwright = await async_playwright().start()
+            self._cond = asyncio.Condition()
+            for _ in range(self.size):
+                self._browsers.append(await self._launch())
+            self._started = True
+
+    async def stop(self) -> None:
+        """Close every browser and the playwright driver"""
+        async with self._start_lock:
+            if not self._started:
+                return
+            self._started = False
+            for task in list(self._background):
+                task.cancel()
+            await asyncio.gather(*self._background, return_exceptions=True)
+            for pooled in self._browsers:
+                try:
+                    await pooled.browser.close()
+                except Exception:
+                    pass
+            self._browsers = []
+            self._cond = None
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _launch(self) -> _PooledBrowser:
+        """Launch one Chromium and remember the pid of its root process"""
+        async with self._launch_lock:
+            before = _chromium_pids()
+            started = time.perf_counter()
+            browser = await self._playwright.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+            if self.on_launch is not None:
+                self.on_launch(time.perf_counter() - started)
+            new_pids = _chromium_pids() - before
+
+        root_pid = None
+        for pid in new_pids:
+            try:
+                if psutil.Process(pid).ppid() not in new_pids:
+                    root_pid = pid
+                    break
+            except psutil.NoSuchProcess:
+                continue
+        return _PooledBrowser(browser, root_pid)
+
+    async def _replace(self, pooled: _PooledBrowser) -> _PooledBrowser:
+        """Close a browser and launch a fresh one in its slot"""
+        try:
+            await pooled.browser.close()
+        except Exception:
+            pass
+        fresh = await self._launch()
+        self._browsers[self._browsers.index(pooled)] = fresh
+        return fresh
+
+    async def _needs_recycle(self, pooled: _PooledBrowser) -> bool:
+        if self.max_scans_per_browser and pooled.scans >= self.max_scans_per_browser:
+            return True
+        if self.max_rss_growth_bytes:
+            # Walking the process tree takes a few ms per browser; keep it off the event loop
+            return await asyncio.to_thread(pooled.rss_growth) >= self.max_rss_growth_bytes
+        return False
+
+    async def _wake_waiters(self) -> None:
+        if self._cond is not None:
+            async with self._cond:
+                self._cond.notify_all()
+
+    async def _recycle(self, pooled: _PooledBrowser) -> None:
+        try:
+            await self._replace(pooled)
+        except Exception:
+            # Leave the closed browser in its slot; the next lease finds it unhealthy and retries
+            pooled.retiring = False
+            raise
+        finally:
+            await self._wake_waiters()
+
+    def _retire(self, pooled: _PooledBrowser) -> None:
+        """Stop leasing on a browser and replace it in the background once its last context closes"""
+        pooled.retiring = True
+        if pooled.active:
+            return
+        task = asyncio.create_task(self._recycle(pooled))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _release(self, pooled: _PooledBrowser) -> None:
+        """Return a lease slot, retiring the browser if it crashed or is due for recycling"""
+        pooled.active -= 1
+        pooled.scans += 1
+        if pooled.retiring:
+            if not pooled.active:
+                self._retire(pooled)
+        elif not pooled.healthy:
+            self._crashes += 1
+            self._retire(pooled)
+        elif await self._needs_recycle(pooled) and not pooled.retiring:
+            self._recycles += 1
+            self._retire(pooled)
+        await self._wake_waiters()
+
+    def _pick(self) -> Optional[_PooledBrowser]:
+        """The least loaded healthy browser with a free context slot"""
+        best = None
+        for pooled in tuple(self._browsers):
+            if pooled.retiring:
+                continue
+            if not pooled.healthy:
+                self._crashes += 1
+                self._retire(pooled)
+                continue
+            if pooled.active < self.contexts_per_browser and (best is None or pooled.active < best.active):
+                best = pooled
+        return best
+
+    async def _acquire(self) -> _PooledBrowser:
+        async with self._cond:
+            while True:
+                pooled = self._pick()
+                if pooled is not None:
+                    pooled.active += 1
+                    return pooled
+                await self._cond.wait()
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[BrowserContext]:
+        """Lease a fresh, isolated BrowserContext on a pooled browser"""
+        if not self._started:
+            await self.start()
+
+        wait_start = time.perf_counter()
+        self._waiting += 1
+        try:
+            pooled = await asyncio.wait_for(self._acquire(), timeout=self.lease_timeout)
+        except asyncio.TimeoutError:
+            self._lease_timeouts += 1
+            raise PoolTimeoutError(
+                f"No browser available within {self.lease_timeout}s"
+            )
+        finally:
+            self._waiting -= 1
+
+        waited = time.perf_counter() - wait_start
+        self._leases += 1
+        self._lease_wait_total += waited
+        self._lease_wait_max = max(self._lease_wait_max, waited)
+
+        context = None
+        try:
+            context = await pooled.browser.new_context(user_agent=USER_AGENT)
+            yield context
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            await asyncio.shield(self._release(pooled))
+
+    def rss_bytes(self) -> int:
+        """Resident memory of every pooled Chromium process tree"""
+        return sum(pooled.rss() for pooled in tuple(self._browsers))
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool statistics reported on /health; samples RSS, so call it from a worker thread"""
+        browsers = tuple(self._browsers)
+        return {
+            'started': self._started,
+            'size': self.size,
+            'contexts_per_browser': self.contexts_per_browser,
+            'capacity': self.capacity,
+            'idle': sum(self.contexts_per_browser - b.active for b in browsers if not b.retiring),
+            'in_use': sum(b.active for b in browsers),
+            'waiting': self._waiting,
+            'leases': self._leases,
+            'lease_timeouts': self._lease_timeouts,
+            'lease_wait_avg_ms': round(self._lease_wait_total / self._leases * 1000, 2) if self._leases else 0.0,
+            'lease_wait_max_ms': round(self._lease_wait_max * 1000, 2),
+            'max_scans_per_browser': self.max_scans_per_browser,
+            'recycles': self._recycles,
+            'crash_replacements': self._crashes,
+            'browser_rss_bytes': self.rss_bytes(),
+        }
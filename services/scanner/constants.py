@@ -0,0 +1,6 @@
+"""
+Constants - values shared by the browser and HTTP-only scan paths
+Kept in one place so both paths present the same client to scanned sites
+"""
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
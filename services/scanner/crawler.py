@@ -0,0 +1,175 @@
+"""
+Crawler - bounded breadth-first crawl frontier over same-site links
+Normalizes and dedupes URLs and scans each depth level concurrently
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+# Query parameters that only carry campaign/click attribution and never change page content
+TRACKING_PARAMS = {
+    'gclid', 'gclsrc', 'dclid', 'fbclid', 'msclkid', 'yclid', 'twclid', 'ttclid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', '_hsenc', '_hsmi', 'igshid', 'ref_src', 'spm',
+}
+TRACKING_PARAM_PREFIXES = ('utm_', 'pk_', 'hsa_', 'vero_')
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# File extensions that never lead to a scannable HTML page
+SKIPPED_EXTENSIONS = (
+    '.pdf', '.zip', '.gz', '.tar', '.rar', '.7z', '.dmg', '.exe', '.msi',
+    '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.ico', '.bmp',
+    '.mp3', '.mp4', '.webm', '.mov', '.avi', '.wav',
+    '.css', '.js', '.json', '.xml', '.rss', '.txt', '.csv',
+    '.woff', '.woff2', '.ttf', '.otf', '.eot',
+    '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+)
+
+# Scan function: returns (resources, outgoing links) for a single page
+PageScanner = Callable[[str], Awaitable[Tuple[List[Any], List[str]]]]
+
+
+def is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PARAM_PREFIXES)
+
+
+def normalize_url(url: str, base: Optional[str] = None) -> Optional[str]:
+    """
+    Canonicalize a URL for deduplication.
+
+    Resolves it against ``base``, lowercases scheme and host, drops default
+    ports, fragments and tracking query parameters, and sorts the remaining
+    query. Returns None for anything that is not http(s).
+    """
+    if base:
+        url = urljoin(base, url)
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parsed.hostname:
+        return None
+
+    host = parsed.hostname.lower().rstrip('.')
+    try:
+        port = parsed.port
+    except ValueError:
+        return None
+    netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not is_tracking_param(key)
+    )
+    return urlunparse((scheme, netloc, parsed.path or '/', '', urlencode(query), ''))
+
+
+def site_key(url: str) -> str:
+    """Host used for same-site comparison, ignoring a leading www."""
+    host = (urlparse(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def is_same_site(url: str, root_site: str) -> bool:
+    """True if url is on the root site or one of its subdomains"""
+    host = site_key(url)
+    return host == root_site or host.endswith('.' + root_site)
+
+
+def is_crawlable(url: str) -> bool:
+    return not urlparse(url).path.lower().endswith(SKIPPED_EXTENSIONS)
+
+
+@dataclass
+class PageResult:
+    url: str
+    depth: int
+    resources: List[Any]
+    error: Optional[str] = None
+
+
+@dataclass
+class CrawlResult:
+    pages: List[PageResult] = field(default_factory=list)
+    # True when the deadline cut the crawl short
+    truncated: bool = False
+
+    @property
+    def pages_scanned(self) -> int:
+        return len(self.pages)
+
+
+async def crawl(
+    start_url: str,
+    scan_page: PageScanner,
+    depth: int = 1,
+    concurrency: int = 4,
+    max_pages_per_level: int = 10,
+    deadline: Optional[float] = None,
+    deadline_grace: float = 5.0,
+) -> CrawlResult:
+    """
+    Breadth-first crawl of same-site links starting at start_url.
+
+    Level 1 is the start page; every further level scans up to
+    max_pages_per_level unseen links discovered on the previous level, with
+    at most ``concurrency`` pages in flight at once. ``deadline`` is an event
+    loop timestamp: pages not started by then are skipped, and a page still
+    running ``deadline_grace`` seconds after it is abandoned.
+    """
+    loop = asyncio.get_running_loop()
+    start = normalize_url(start_url) or start_url
+    root_site = site_key(start)
+    seen: Set[str] = {start}
+    frontier = [start]
+    result = CrawlResult()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def visit(url: str, level: int) -> Optional[Tuple[PageResult, List[str]]]:
+        async with semaphore:
+            if deadline is None:
+                timeout = None
+            else:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    result.truncated = True
+                    return None
+                timeout += deadline_grace
+            try:
+                resources, links = await asyncio.wait_for(scan_page(url), timeout)
+                return PageResult(url=url, depth=level, resources=resources), links
+            except asyncio.TimeoutError:
+                result.truncated = True
+                return PageResult(url=url, depth=level, resources=[], error='Scan deadline exceeded'), []
+            except Exception as e:
+                return PageResult(url=url, depth=level, resources=[], error=str(e)), []
+
+    for level in range(1, depth + 1):
+        if not frontier:
+            break
+        if deadline is not None and loop.time() >= deadline:
+            result.truncated = True
+            break
+        visited = await asyncio.gather(*(visit(url, level) for url in frontier))
+
+        next_frontier: List[str] = []
+        for page_result, links in filter(None, visited):
+            result.pages.append(page_result)
+            if level == depth:
+                continue
+            for link in links:
+                if len(next_frontier) >= max_pages_per_level:
+                    break
+                normalized = normalize_url(link, page_result.url)
+                if (
+                    normalized
+                    and normalized not in seen
+                    and is_same_site(normalized, root_site)
+                    and is_crawlable(normalized)
+                ):
+                    seen.add(normalized)
+                    next_frontier.append(normalized)
+        frontier = next_frontier
+
+    return result
@@ -0,0 +1,31 @@
+"""
+Logging Setup - structlog configuration shared by the scanner modules
+JSON lines in production; LOG_FORMAT=console gives readable output for local runs
+"""
+
+import logging
+import os
+
+import structlog
+
+
+def configure_logging() -> None:
+    level = logging.getLevelName(os.getenv("LOG_LEVEL", "info").upper())
+    if not isinstance(level, int):
+        level = logging.INFO
+    renderer = (
+        structlog.dev.ConsoleRenderer()
+        if os.getenv("LOG_FORMAT", "json") == "console"
+        else structlog.processors.JSONRenderer()
+    )
+    structlog.configure(
+        processors=[
+            structlog.contextvars.merge_contextvars,
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.format_exc_info,
+            renderer,
+        ],
+        wrapper_class=structlog.make_filtering_bound_logger(level),
+        cache_logger_on_first_use=True,
+    )
@@ -7,27 +7,68 @@ Detects third-party scripts, cookies, and trackers using Playwright
 import os
 import json
 import asyncio
-from typing import List, Dict, Any
+import hashlib
+import time
+from typing import List, Dict, Any, Callable, Optional, Tuple
 from urllib.parse import urlparse, urljoin
 import re
+from contextlib import asynccontextmanager
 from datetime import datetime
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, HttpUrl, validator
+import structlog
 import uvicorn
 
+from logging_setup import configure_logging
+
+configure_logging()
+logger = structlog.get_logger(__name__)
+
 try:
-    from playwright.async_api import async_playwright, Page, Browser
+    from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 except ImportError:
-    print("Playwright not installed. Run: pip install playwright && playwright install")
+    logger.error("playwright_not_installed", hint="pip install playwright && playwright install")
     raise
 
+from browser_pool import BrowserPool, PoolTimeoutError
+from admission import AdmissionController, AdmissionRejected
+from tracker_classifier import KNOWN_TRACKERS, TrackerClassifier
+from batch_scan import BatchScanner
+from crawler import CrawlResult, crawl, normalize_url
+from scan_jobs import QueueFullError, ScanJobQueue, new_scan_id
+from network_capture import NetworkCapture, extract_dom
+from page_settle import SettleTracker
+from resource_blocking import BLOCKABLE_RESOURCE_TYPES, DEFAULT_BLOCKED_TYPES, ResourceBlocker
+from static_scan import StaticFetcher, StaticPage, browser_escalation_reasons
+from rescan import RescanTracker
+from scan_cache import CACHE_BYPASS, ScanCache, cache_key
+from scan_summary import Resource, ResourceAccumulator, make_resource
+from json_response import FastJSONResponse, dumps
+from metrics import BROWSER_LAUNCH_SECONDS, SCANS_IN_FLIGHT, SCANS_TOTAL, PhaseTimer, record_scan, render_metrics, timed_phase
+from scan_store import ScanStore, STATUS_COMPLETED, STATUS_FAILED, create_scan_store
+
+SCAN_MODES = ('auto', 'static', 'full')
+STREAM_FORMATS = {'ndjson': 'application/x-ndjson', 'sse': 'text/event-stream'}
+BATCH_MAX_SCANS = int(os.getenv("SCANNER_BATCH_MAX_SCANS", "500"))
+
 # Pydantic models for request/response
 class ScanRequest(BaseModel):
     url: HttpUrl
     depth: int = 1
     timeout: int = 30
+    # auto: static HTTP pre-scan, escalating to the browser when needed; static: never
+    # launch the browser; full: always scan in the browser
+    mode: str = 'auto'
+    # Lightweight mode: record heavy subresources but skip downloading their bodies
+    lightweight: bool = False
+    block_resource_types: List[str] = list(DEFAULT_BLOCKED_TYPES)
+    # Add a per-phase timing breakdown (seconds) to the result
+    include_timings: bool = False
+    # Skip pages unchanged since the last incremental scan of this site and
+    # return only the resources added, removed or changed since then
+    incremental: bool = False
     
     @validator('depth')
     def validate_depth(cls, v):
@@ -40,6 +81,19 @@ class ScanRequest(BaseModel):
         if v < 5 or v > 120:
             raise ValueError('Timeout must be between 5 and 120 seconds')
         return v
+    
+    @validator('mode')
+    def validate_mode(cls, v):
+        if v not in SCAN_MODES:
+            raise ValueError(f"Mode must be one of {list(SCAN_MODES)}")
+        return v
+    
+    @validator('block_resource_types')
+    def validate_block_resource_types(cls, v):
+        invalid = set(v) - set(BLOCKABLE_RESOURCE_TYPES)
+        if invalid:
+            raise ValueError(f"Cannot block resource types {sorted(invalid)}; allowed: {list(BLOCKABLE_RESOURCE_TYPES)}")
+        return sorted(set(v))
 
 class ThirdPartyResource(BaseModel):
     host: str
@@ -48,6 +102,7 @@ class ThirdPartyResource(BaseModel):
     risk_level: str  # low, medium, high, critical
     description: str
     category: str = "general"
+    occurrences: int = 1
 
 class ScanResult(BaseModel):
     scan_id: str
@@ -57,44 +112,158 @@ class ScanResult(BaseModel):
     summary: Dict[str, Any]
     scan_duration: float
     pages_scanned: int
+    timings: Optional[Dict[str, float]] = None
+    delta: Optional[Dict[str, Any]] = None
+
+class BatchScanRequest(BaseModel):
+    scans: List[ScanRequest]
+    
+    @validator('scans')
+    def validate_scans(cls, v):
+        if not v or len(v) > BATCH_MAX_SCANS:
+            raise ValueError(f'Batch must contain between 1 and {BATCH_MAX_SCANS} scans')
+        return v
+
+class BatchScanItem(BaseModel):
+    url: str
+    status: str  # completed, failed
+    result: Optional[ScanResult] = None
+    error: Optional[str] = None
+
+class BatchScanResponse(BaseModel):
+    total: int
+    completed: int
+    failed: int
+    results: List[BatchScanItem]
+    duration: float
+
+# Warm browser pool shared by all scans for the lifetime of the process
+browser_pool = BrowserPool(
+    size=int(os.getenv("SCANNER_POOL_SIZE", "2")),
+    contexts_per_browser=int(os.getenv("SCANNER_POOL_CONTEXTS_PER_BROWSER", "2")),
+    max_scans_per_browser=int(os.getenv("SCANNER_POOL_MAX_SCANS", "50")),
+    max_rss_growth_mb=int(os.getenv("SCANNER_POOL_MAX_RSS_GROWTH_MB", "512")),
+    lease_timeout=float(os.getenv("SCANNER_POOL_LEASE_TIMEOUT", "30")),
+    on_launch=BROWSER_LAUNCH_SECONDS.observe,
+)
+
+# Crawl limits for depth > 1 scans
+CRAWL_CONCURRENCY = int(os.getenv("SCANNER_CRAWL_CONCURRENCY", "4"))
+CRAWL_MAX_PAGES_PER_LEVEL = int(os.getenv("SCANNER_CRAWL_MAX_PAGES_PER_LEVEL", "10"))
+
+# Page settle detection: quiet window, cap on settling after DOMContentLoaded,
+# and age after which an open request (long-polling) no longer counts as activity
+SETTLE_QUIET_MS = int(os.getenv("SCANNER_SETTLE_QUIET_MS", "500"))
+SETTLE_MAX_MS = int(os.getenv("SCANNER_SETTLE_MAX_MS", "10000"))
+SETTLE_LONG_REQUEST_MS = int(os.getenv("SCANNER_SETTLE_LONG_REQUEST_MS", "5000"))
+
+# Admission control: global and per-host scan concurrency, bounded wait queue,
+# and a browser memory ceiling above which new scans wait. Concurrency defaults to
+# the pool's context capacity so admitted scans never queue for a browser lease
+admission = AdmissionController(
+    max_concurrent=int(os.getenv("SCANNER_MAX_CONCURRENT_SCANS", "0")) or browser_pool.capacity,
+    max_per_host=int(os.getenv("SCANNER_MAX_SCANS_PER_HOST", "2")),
+    max_waiting=int(os.getenv("SCANNER_MAX_WAITING_SCANS", "20")),
+    max_wait=float(os.getenv("SCANNER_ADMISSION_TIMEOUT", "30")),
+    memory_limit_mb=int(os.getenv("SCANNER_MAX_BROWSER_RSS_MB", "2048")),
+    mb_per_scan=int(os.getenv("SCANNER_ADMISSION_MB_PER_SCAN", "200")),
+    memory_fn=browser_pool.rss_bytes,
+)
+
+# How often a synchronous scan checks whether its client is still connected
+DISCONNECT_POLL_SECONDS = 1.0
+
+def api_browser_headroom() -> int:
+    """Memory this process's browser pool may still grow into, kept free of batch workers"""
+    ceiling = admission.memory_limit_bytes or admission.max_concurrent * admission.scan_bytes
+    return max(0, ceiling - browser_pool.rss_bytes())
+
+# Process pool for POST /scan/batch; each worker process owns its own browsers
+batch_scanner = BatchScanner(
+    scans_per_process=int(os.getenv("SCANNER_BATCH_SCANS_PER_PROCESS", "2")),
+    mb_per_scan=int(os.getenv("SCANNER_BATCH_MB_PER_SCAN", "400")),
+    max_processes=int(os.getenv("SCANNER_BATCH_MAX_PROCESSES", "0")) or None,
+    reserved_bytes=api_browser_headroom,
+)
+
+# Shared HTTP client for the static (browserless) fast path
+static_fetcher = StaticFetcher(
+    max_body_bytes=int(os.getenv("SCANNER_STATIC_MAX_BODY_BYTES", str(2 * 1024 * 1024)))
+)
+
+# Indexed tracker-domain classifier, extended at startup with external lists
+tracker_classifier = TrackerClassifier(KNOWN_TRACKERS)
+
+def load_tracker_lists() -> None:
+    """Load external tracker lists named in SCANNER_TRACKER_LISTS (comma-separated paths)"""
+    for path in filter(None, (p.strip() for p in os.getenv("SCANNER_TRACKER_LISTS", "").split(","))):
+        try:
+            added = tracker_classifier.load_file(path)
+        except (OSError, ValueError) as e:
+            # A missing or malformed list should not keep the service from starting
+            logger.warning("tracker_list_skipped", path=path, error=str(e))
+            continue
+        logger.info("tracker_list_loaded", path=path, domains=added)
+
+def cacheable_result(result: Dict[str, Any]) -> bool:
+    """Truncated scans and scans whose every page failed must not be served as "no trackers" later"""
+    summary = result['summary']
+    return not summary['partial'] and len(summary.get('page_errors', ())) < result['pages_scanned']
+
+# Result cache in front of scan_website, keyed on normalized URL + depth
+scan_cache = ScanCache(
+    max_entries=int(os.getenv("SCANNER_CACHE_MAX_ENTRIES", "256")),
+    ttl=float(os.getenv("SCANNER_CACHE_TTL", "900")),
+    stale_ttl=float(os.getenv("SCANNER_CACHE_STALE_TTL", "3600")),
+    disk_dir=os.getenv("SCANNER_CACHE_DIR") or None,
+    cacheable=cacheable_result,
+)
+
+# Scan result store and async job queue, created in the app lifespan
+SCANNER_RESULT_STORE = os.getenv("SCANNER_RESULT_STORE", "sqlite://data/scans.db")
+scan_store: Optional[ScanStore] = None
+scan_jobs: Optional[ScanJobQueue] = None
+
+async def run_scan_job(scan_id: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a queued scan and return its serialized result"""
+    request = ScanRequest(**params)
+    url = str(request.url)
+    # The job queue bounds itself, so jobs wait for a slot without a deadline
+    async with admission.slot(extract_domain(url), bounded=False):
+        return await run_scan(url, request, scan_id=scan_id, admitted=True)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the browser pool, result store and job workers on startup, close them on shutdown"""
+    global scan_store, scan_jobs
+    load_tracker_lists()
+    scan_store = create_scan_store(SCANNER_RESULT_STORE)
+    scan_jobs = ScanJobQueue(
+        scan_store,
+        run_scan_job,
+        workers=int(os.getenv("SCANNER_JOB_WORKERS", "2")),
+        max_queued=int(os.getenv("SCANNER_JOB_MAX_QUEUED", "100"))
+    )
+    await browser_pool.start()
+    await scan_jobs.start()
+    try:
+        yield
+    finally:
+        await scan_jobs.stop()
+        await browser_pool.stop()
+        await static_fetcher.close()
+        await asyncio.to_thread(batch_scanner.shutdown)
+        await scan_store.close()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Site Scanner Service",
     description="Scan websites for third-party scripts, cookies, and trackers",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
-# Known tracker/analytics domains
-KNOWN_TRACKERS = {
-    'google-analytics.com': {'type': 'analytics', 'risk': 'low', 'category': 'analytics'},
-    'googletagmanager.com': {'type': 'tag_manager', 'risk': 'low', 'category': 'analytics'},
-    'doubleclick.net': {'type': 'advertising', 'risk': 'medium', 'category': 'advertising'},
-    'facebook.net': {'type': 'social_tracking', 'risk': 'medium', 'category': 'social'},
-    'facebook.com': {'type': 'social_tracking', 'risk': 'medium', 'category': 'social'},
-    'twitter.com': {'type': 'social_tracking', 'risk': 'medium', 'category': 'social'},
-    'linkedin.com': {'type': 'social_tracking', 'risk': 'medium', 'category': 'social'},
-    'hotjar.com': {'type': 'heat_mapping', 'risk': 'medium', 'category': 'analytics'},
-    'mixpanel.com': {'type': 'analytics', 'risk': 'low', 'category': 'analytics'},
-    'segment.com': {'type': 'analytics', 'risk': 'low', 'category': 'analytics'},
-    'intercom.io': {'type': 'chat', 'risk': 'low', 'category': 'customer_support'},
-    'zendesk.com': {'type': 'chat', 'risk': 'low', 'category': 'customer_support'},
-    'cloudflare.com': {'type': 'cdn', 'risk': 'low', 'category': 'infrastructure'},
-    'amazonaws.com': {'type': 'cdn', 'risk': 'low', 'category': 'infrastructure'},
-    'cdnjs.cloudflare.com': {'type': 'cdn', 'risk': 'low', 'category': 'infrastructure'},
-    'fonts.googleapis.com': {'type': 'fonts', 'risk': 'low', 'category': 'ui'},
-    'fonts.gstatic.com': {'type': 'fonts', 'risk': 'low', 'category': 'ui'},
-    'youtube.com': {'type': 'video', 'risk': 'medium', 'category': 'media'},
-    'youtu.be': {'type': 'video', 'risk': 'medium', 'category': 'media'},
-    'vimeo.com': {'type': 'video', 'risk': 'medium', 'category': 'media'},
-    'wistia.com': {'type': 'video', 'risk': 'medium', 'category': 'media'},
-    'stripe.com': {'type': 'payment', 'risk': 'low', 'category': 'payments'},
-    'paypal.com': {'type': 'payment', 'risk': 'low', 'category': 'payments'},
-    'braintreepayments.com': {'type': 'payment', 'risk': 'low', 'category': 'payments'},
-    'recaptcha.net': {'type': 'security', 'risk': 'low', 'category': 'security'},
-    'hcaptcha.com': {'type': 'security', 'risk': 'low', 'category': 'security'},
-}
-
 def extract_domain(url: str) -> str:
     """Extract domain from URL"""
     parsed = urlparse(url)
@@ -102,274 +271,579 @@ def extract_domain(url: str) -> str:
 
 def determine_risk_level(domain: str, resource_type: str) -> str:
     """Determine risk level based on domain and resource type"""
-    domain_lower = domain.lower()
-    
-    # Check known trackers
-    for known_domain, info in KNOWN_TRACKERS.items():
-        if known_domain in domain_lower:
-            return info['risk']
-    
-    # Default risk assessment
-    if resource_type in ['script', 'iframe']:
-        # External scripts are medium risk by default
-        return 'medium'
-    elif resource_type == 'cookie':
-        # Cookies depend on type - we'll assess this when we have more info
-        return 'low'
-    elif resource_type == 'pixel':
-        # Tracking pixels are typically medium-high risk
-        return 'medium'
-    else:
-        return 'low'
+    return tracker_classifier.classify(domain, resource_type).risk
 
 def categorize_resource(domain: str, resource_type: str) -> str:
     """Categorize the third-party resource"""
-    domain_lower = domain.lower()
-    
-    for known_domain, info in KNOWN_TRACKERS.items():
-        if known_domain in domain_lower:
-            return info.get('category', 'general')
-    
-    # Default categorization based on resource type
-    if resource_type == 'script':
-        return 'script'
-    elif resource_type == 'cookie':
-        return 'cookie'
-    elif resource_type == 'pixel':
-        return 'tracking'
-    else:
-        return 'general'
-
-async def scan_page(page: Page, url: str) -> List[ThirdPartyResource]:
-    """Scan a single page for third-party resources"""
+    return tracker_classifier.classify(domain, resource_type).category
+
+def third_party_resource(domain: str, resource_type: str, url: str, description: str, count: int = 1) -> Resource:
+    """Classify a third-party URL and build its resource record"""
+    classification = tracker_classifier.classify(domain, resource_type)
+    return make_resource(domain, resource_type, url, classification.risk, description, classification.category, count)
+
+def cookie_resource(domain: str, name: str) -> Resource:
+    # The name is part of the URL so each cookie is its own record, not merged per domain
+    domain = domain.lstrip('.')
+    return make_resource(domain, 'cookie', f"cookie://{domain}/{name}", 'low', f"Cookie: {name}", 'cookie')
+
+def dom_resources(dom: Dict[str, List], first_party: set, declared_sizes_only: bool = False) -> List[Resource]:
+    """
+    Build resources from extracted scripts, images and iframes
+
+    ``declared_sizes_only`` makes pixel detection use width/height attributes
+    rather than rendered size, for stubbed images and static HTML.
+    """
+    resources = []
+    
+    for script_src in dom['scripts']:
+        domain = extract_domain(script_src)
+        if domain and domain not in first_party:  # Third-party
+            resources.append(third_party_resource(
+                domain, 'script', script_src, f"External script from {domain}"
+            ))
+    
+    for img in dom['images']:
+        domain = extract_domain(img['src'])
+        if domain and domain not in first_party:  # Third-party
+            # Check if it's a tracking pixel (small dimensions)
+            width, height = img.get('width', 0), img.get('height', 0)
+            if declared_sizes_only:
+                width = img['declaredWidth'] if img.get('declaredWidth') is not None else 3
+                height = img['declaredHeight'] if img.get('declaredHeight') is not None else 3
+            is_pixel = (width <= 2 and height <= 2) or \
+                      ('pixel' in img['src'].lower() or 'track' in img['src'].lower())
+            
+            resource_type = 'pixel' if is_pixel else 'image'
+            resources.append(third_party_resource(
+                domain, resource_type, img['src'], f"{resource_type.title()} from {domain}"
+            ))
+    
+    for iframe_src in dom['iframes']:
+        domain = extract_domain(iframe_src)
+        if domain and domain not in first_party:  # Third-party
+            resources.append(third_party_resource(
+                domain, 'iframe', iframe_src, f"Embedded iframe from {domain}"
+            ))
+    
+    return resources
+
+def static_page_resources(url: str, page: StaticPage) -> List[Resource]:
+    """Build resources from a statically fetched page"""
+    first_party = {extract_domain(url), extract_domain(page.url)}
+    resources = []
+    
+    for cookie in page.cookies:
+        resources.append(cookie_resource(cookie['domain'], cookie['name'] or 'unknown'))
+    
+    resources.extend(dom_resources(page.dom(), first_party, declared_sizes_only=True))
+    
+    for link in page.link_resources:
+        domain = extract_domain(link['href'])
+        if domain and domain not in first_party:  # Third-party
+            if 'stylesheet' in link['rel'].split():
+                resource_type = 'stylesheet'
+            elif link['as'] == 'script':
+                resource_type = 'script'
+            else:
+                resource_type = 'network_request'
+            resources.append(third_party_resource(
+                domain,
+                resource_type,
+                link['href'],
+                f"{resource_type.replace('_', ' ').title()} ({link['rel']}) from {domain}"
+            ))
+    
+    return resources
+
+async def scan_page(
+    page: Page,
+    url: str,
+    deadline: Optional[float] = None,
+    collect_links: bool = False,
+    lightweight: bool = False,
+    on_network_resource: Optional[Callable[[Resource], None]] = None,
+    timer: Optional[PhaseTimer] = None,
+    page_info: Optional[Dict[str, Any]] = None
+) -> Tuple[List[Resource], List[str]]:
+    """
+    Scan a single page for third-party resources
+
+    Returns the resources and, if ``collect_links`` is set, the page's outgoing
+    links. ``lightweight`` tells pixel detection that image bodies were stubbed.
+    ``on_network_resource`` is called with third-party requests as they happen.
+    ``deadline`` is an event loop timestamp bounding navigation and settling;
+    when it is reached, whatever the page has loaded so far is extracted.
+    Phases are timed into ``timer`` when one is given. ``page_info`` is filled
+    with the document's ETag, Last-Modified and body hash for rescan fingerprints.
+    Navigation errors (other than hitting the deadline) are raised, so the
+    crawl records the page as failed instead of as a page without trackers.
+    """
     resources = []
+    loop = asyncio.get_running_loop()
+    if deadline is None:
+        deadline = loop.time() + 30
+    
+    # Attach passive collectors before navigation so no request is missed
+    on_capture = None
+    if on_network_resource is not None:
+        def on_capture(request):
+            domain = extract_domain(request.url)
+            # page.url is still about:blank while the first document loads, so
+            # redirect targets come from the capture's navigation hosts
+            if domain and domain != extract_domain(url) and domain not in capture.navigation_hosts \
+                    and domain != extract_domain(page.url):
+                on_network_resource(third_party_resource(
+                    domain,
+                    request.resource_type,
+                    request.url,
+                    f"{request.resource_type.replace('_', ' ').title()} from {domain}"
+                ))
+    capture = NetworkCapture(page, on_capture=on_capture).attach()
+    settle = await SettleTracker(
+        page,
+        quiet_ms=SETTLE_QUIET_MS,
+        max_settle_ms=SETTLE_MAX_MS,
+        long_request_ms=SETTLE_LONG_REQUEST_MS
+    ).attach()
     
+    # Navigate to page within the remaining scan budget
+    remaining_ms = (deadline - loop.time()) * 1000
+    if remaining_ms < 1:
+        raise asyncio.TimeoutError(f"Scan deadline reached before loading {url}")
+    response = None
     try:
-        # Navigate to page with timeout
-        await page.goto(url, wait_until='networkidle', timeout=30000)
-        
-        # Wait a bit for dynamic content
-        await asyncio.sleep(2)
-        
-        # Get page cookies
+        with timed_phase('goto', timer):
+            response = await page.goto(url, wait_until='domcontentloaded', timeout=remaining_ms)
+    except PlaywrightTimeoutError:
+        logger.info("page_load_deadline_reached", url=url)
+    if page_info is not None and response is not None:
+        page_info['etag'] = response.headers.get('etag')
+        page_info['last_modified'] = response.headers.get('last-modified')
+        try:
+            page_info['content_hash'] = hashlib.sha256(await response.body()).hexdigest()
+        except Exception:
+            pass  # body unavailable (e.g. redirected document); page is simply rescanned next time
+    
+    # Wait until network and DOM are quiet instead of a fixed sleep
+    with timed_phase('settle', timer):
+        await settle.wait(deadline)
+    
+    # The requested host, every redirect hop and the final host count as first party
+    first_party = {extract_domain(url), extract_domain(page.url)} | capture.navigation_hosts
+    
+    # Get page cookies
+    with timed_phase('cookies', timer):
         cookies = await page.context.cookies()
+    
+    # Get scripts, images, iframes and links in one round-trip
+    with timed_phase('extract', timer):
+        dom = await extract_dom(page, collect_links)
+    links = dom['links']
+    
+    with timed_phase('classify', timer):
         for cookie in cookies:
             domain = cookie.get('domain', '')
             if domain:
-                resources.append(ThirdPartyResource(
-                    host=domain.lstrip('.'),
-                    type='cookie',
-                    url=f"cookie://{domain.lstrip('.')}",
-                    risk_level='low',
-                    description=f"Cookie: {cookie.get('name', 'unknown')}",
-                    category='cookie'
-                ))
-        
-        # Get all script sources
-        scripts = await page.evaluate("""
-            () => {
-                const scripts = Array.from(document.scripts);
-                return scripts.map(script => ({
-                    src: script.src || null,
-                    innerHTML: script.innerHTML.substring(0, 200) // Limit size
-                })).filter(script => script.src);
-            }
-        """)
-        
-        for script in scripts:
-            if script['src']:
-                domain = extract_domain(script['src'])
-                if domain and domain != extract_domain(url):  # Third-party
-                    risk_level = determine_risk_level(domain, 'script')
-                    category = categorize_resource(domain, 'script')
-                    
-                    resources.append(ThirdPartyResource(
-                        host=domain,
-                        type='script',
-                        url=script['src'],
-                        risk_level=risk_level,
-                        description=f"External script from {domain}",
-                        category=category
-                    ))
-        
-        # Get all images (potential tracking pixels)
-        images = await page.evaluate("""
-            () => {
-                const images = Array.from(document.images);
-                return images.map(img => ({
-                    src: img.src,
-                    width: img.width,
-                    height: img.height
-                }));
-            }
-        """)
+                resources.append(cookie_resource(domain, cookie.get('name', 'unknown')))
         
-        for img in images:
-            if img['src']:
-                domain = extract_domain(img['src'])
-                if domain and domain != extract_domain(url):  # Third-party
-                    # Check if it's a tracking pixel (small dimensions)
-                    is_pixel = (img.get('width', 0) <= 2 and img.get('height', 0) <= 2) or \
-                              ('pixel' in img['src'].lower() or 'track' in img['src'].lower())
-                    
-                    resource_type = 'pixel' if is_pixel else 'image'
-                    risk_level = determine_risk_level(domain, resource_type)
-                    category = categorize_resource(domain, resource_type)
-                    
-                    resources.append(ThirdPartyResource(
-                        host=domain,
-                        type=resource_type,
-                        url=img['src'],
-                        risk_level=risk_level,
-                        description=f"{resource_type.title()} from {domain}",
-                        category=category
-                    ))
+        resources.extend(dom_resources(dom, first_party, declared_sizes_only=lightweight))
         
-        # Get all iframes
-        iframes = await page.evaluate("""
-            () => {
-                const iframes = Array.from(document.querySelectorAll('iframe'));
-                return iframes.map(iframe => iframe.src);
-            }
-        """)
-        
-        for iframe_src in iframes:
-            if iframe_src:
-                domain = extract_domain(iframe_src)
-                if domain and domain != extract_domain(url):  # Third-party
-                    risk_level = determine_risk_level(domain, 'iframe')
-                    category = categorize_resource(domain, 'iframe')
-                    
-                    resources.append(ThirdPartyResource(
-                        host=domain,
-                        type='iframe',
-                        url=iframe_src,
-                        risk_level=risk_level,
-                        description=f"Embedded iframe from {domain}",
-                        category=category
-                    ))
-        
-        # Get network requests made by the page
-        def handle_response(response):
-            url = response.url
-            domain = extract_domain(url)
-            if domain and domain != extract_domain(page.url):
-                resource_type = 'network_request'
-                if 'script' in response.headers.get('content-type', ''):
-                    resource_type = 'script'
-                elif 'image' in response.headers.get('content-type', ''):
-                    resource_type = 'image'
-                elif 'css' in response.headers.get('content-type', ''):
-                    resource_type = 'stylesheet'
-                
-                risk_level = determine_risk_level(domain, resource_type)
-                category = categorize_resource(domain, resource_type)
-                
-                resources.append(ThirdPartyResource(
-                    host=domain,
-                    type=resource_type,
-                    url=url,
-                    risk_level=risk_level,
-                    description=f"{resource_type.replace('_', ' ').title()} from {domain}",
-                    category=category
+        # Network requests recorded since before navigation; the first sighting of
+        # each was already reported live when on_network_resource is set
+        reported_live = 1 if on_network_resource is not None else 0
+        for request in capture.captured():
+            domain = extract_domain(request.url)
+            count = request.count - reported_live
+            if domain and domain not in first_party and count > 0:  # Third-party
+                resource_type = request.resource_type
+                resources.append(third_party_resource(
+                    domain,
+                    resource_type,
+                    request.url,
+                    f"{resource_type.replace('_', ' ').title()} from {domain}",
+                    count=count
                 ))
+    
+    return resources, links
+
+async def reuse_unchanged_page(
+    page_url: str,
+    depth: int,
+    deadline: float,
+    ingest: Callable[[Resource], None],
+    timer: PhaseTimer,
+    rescan: RescanTracker
+) -> Optional[List[str]]:
+    """Replay a page's baseline findings if it is unchanged; returns its links, or None to scan it"""
+    loop = asyncio.get_running_loop()
+    with timer.phase('static_fetch'):
+        prior = await rescan.revalidate(page_url, static_fetcher, timeout=max(1.0, deadline - loop.time()))
+    if prior is None:
+        return None
+    for resource in rescan.reuse(page_url, prior):
+        ingest(resource)
+    return prior['links'] if depth > 1 else []
+
+async def browser_crawl(
+    url: str,
+    depth: int,
+    deadline: float,
+    ingest: Callable[[Resource], None],
+    timer: PhaseTimer,
+    lightweight: bool = False,
+    block_resource_types: Optional[List[str]] = None,
+    rescan: Optional[RescanTracker] = None
+) -> Tuple[CrawlResult, Optional[ResourceBlocker]]:
+    """Crawl in a leased browser context, handing every resource to ingest"""
+    lease_started = time.perf_counter()
+    async with browser_pool.lease() as context:
+        timer.record('browser_lease', time.perf_counter() - lease_started)
+        blocker = None
+        if lightweight:
+            blocker = ResourceBlocker(
+                block_resource_types if block_resource_types is not None else DEFAULT_BLOCKED_TYPES
+            )
         
-        page.on('response', handle_response)
+        async def scan_one(page_url: str):
+            if rescan is not None:
+                links = await reuse_unchanged_page(page_url, depth, deadline, ingest, timer, rescan)
+                if links is not None:
+                    return [], links
+            
+            page = await context.new_page()
+            # Validators and the body hash cost an extra round-trip; only fingerprints need them
+            page_info = {} if rescan is not None else None
+            try:
+                if blocker is not None:
+                    await blocker.attach(page)
+                resources, links = await scan_page(
+                    page,
+                    page_url,
+                    deadline,
+                    collect_links=depth > 1,
+                    lightweight=lightweight,
+                    # Page fingerprints need every resource in the page's own list
+                    on_network_resource=ingest if rescan is None else None,
+                    timer=timer,
+                    page_info=page_info
+                )
+            except Exception:
+                if rescan is not None:
+                    for resource in rescan.fail(page_url):
+                        ingest(resource)
+                raise
+            finally:
+                await page.close()
+            for resource in resources:
+                ingest(resource)
+            if rescan is not None:
+                rescan.record(page_url, resources, links, **page_info)
+            return [], links
         
-    except Exception as e:
-        print(f"Error scanning page {url}: {str(e)}")
+        crawl_result = await crawl(
+            url,
+            scan_one,
+            depth=depth,
+            concurrency=CRAWL_CONCURRENCY,
+            max_pages_per_level=CRAWL_MAX_PAGES_PER_LEVEL,
+            deadline=deadline
+        )
+    return crawl_result, blocker
+
+async def static_crawl(
+    url: str,
+    depth: int,
+    deadline: float,
+    landing: StaticPage,
+    ingest: Callable[[Resource], None],
+    timer: PhaseTimer,
+    rescan: Optional[RescanTracker] = None
+) -> CrawlResult:
+    """Crawl over plain HTTP, reusing the already fetched landing page"""
+    loop = asyncio.get_running_loop()
+    landing_key = normalize_url(url)
     
-    return resources
+    async def scan_one(page_url: str):
+        page = None
+        if rescan is not None:
+            links = await reuse_unchanged_page(page_url, depth, deadline, ingest, timer, rescan)
+            if links is not None:
+                return [], links
+            page = rescan.fetched(page_url)
+        if page is None and page_url == landing_key:
+            page = landing
+        elif page is None:
+            with timer.phase('static_fetch'):
+                page = await static_fetcher.fetch(page_url, timeout=max(1.0, deadline - loop.time()))
+        if page.error:
+            if rescan is not None:
+                for resource in rescan.fail(page_url):
+                    ingest(resource)
+            raise RuntimeError(page.error)
+        with timer.phase('classify'):
+            resources = static_page_resources(page_url, page)
+        for resource in resources:
+            ingest(resource)
+        if rescan is not None:
+            rescan.record(
+                page_url,
+                resources,
+                page.links,
+                etag=page.etag,
+                last_modified=page.last_modified,
+                content_hash=page.content_hash
+            )
+        return [], page.links if depth > 1 else []
+    
+    return await crawl(
+        url,
+        scan_one,
+        depth=depth,
+        concurrency=CRAWL_CONCURRENCY,
+        max_pages_per_level=CRAWL_MAX_PAGES_PER_LEVEL,
+        deadline=deadline
+    )
+
+async def scan_website(
+    url: str,
+    depth: int = 1,
+    timeout: int = 30,
+    scan_id: Optional[str] = None,
+    lightweight: bool = False,
+    block_resource_types: Optional[List[str]] = None,
+    mode: str = 'full',
+    on_resource: Optional[Callable[[Resource], None]] = None,
+    include_timings: bool = False,
+    rescan: Optional[RescanTracker] = None
+) -> Dict[str, Any]:
+    """
+    Scan a website for third-party resources, crawling same-site links up to depth levels
+
+    ``timeout`` (seconds) is the budget for the whole scan; pages not reached in
+    time are skipped and the result is flagged as partial in the summary. In
+    ``lightweight`` mode bodies of ``block_resource_types`` are never downloaded.
+    ``mode`` is one of SCAN_MODES: in ``auto`` the landing page is fetched over
+    plain HTTP first and the browser is only used if it looks client-rendered.
 
-async def scan_website(url: str, depth: int = 1, timeout: int = 30) -> ScanResult:
-    """Scan a website for third-party resources"""
+    With ``on_resource`` set, each unique resource is passed to it as soon as it
+    is discovered and the returned result carries only the summary. The result
+    is a plain dict in the ScanResult shape, ready to be encoded as is.
+    ``include_timings`` adds the per-phase breakdown under ``timings``. With
+    ``rescan``, pages unchanged since its baseline replay their previous
+    findings and every page is fingerprinted into it.
+    """
     start_time = datetime.now()
-    scan_id = f"scan_{int(start_time.timestamp())}"
-    
-    async with async_playwright() as p:
-        # Launch browser
-        browser = await p.chromium.launch(
-            headless=True,
-            args=[
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-                '--disable-dev-shm-usage',
-                '--disable-gpu',
-                '--disable-web-security',
-                '--disable-features=VizDisplayCompositor'
-            ]
-        )
-        
-        # Create context
-        context = await browser.new_context(
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    scan_id = scan_id or new_scan_id()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    
+    accumulator = ResourceAccumulator(keep_resources=on_resource is None)
+    timer = PhaseTimer()
+    
+    def ingest(resource: Resource) -> None:
+        if accumulator.add(resource) and on_resource is not None:
+            on_resource(resource)
+    
+    blocker = None
+    escalation_reasons = []
+    crawl_result = None
+    if mode != 'full':
+        with timer.phase('static_fetch'):
+            landing = await static_fetcher.fetch(url, timeout=timeout)
+        if rescan is not None:
+            rescan.remember_fetch(normalize_url(url), landing)
+        escalation_reasons = browser_escalation_reasons(landing)
+        if mode == 'static' or not escalation_reasons:
+            crawl_result = await static_crawl(url, depth, deadline, landing, ingest, timer, rescan)
+    
+    scan_mode = 'static' if crawl_result is not None else 'browser'
+    if crawl_result is None:
+        crawl_result, blocker = await browser_crawl(
+            url, depth, deadline, ingest, timer, lightweight, block_resource_types, rescan
         )
-        
-        # Create page
-        page = await context.new_page()
-        
-        # Enable request interception to catch all network requests
-        await page.route('**/*', lambda route: route.continue_())
-        
+    
+    page_errors = []
+    for page_result in crawl_result.pages:
+        if page_result.error:
+            logger.warning("page_scan_failed", scan_id=scan_id, url=page_result.url, error=page_result.error)
+            page_errors.append({'url': page_result.url, 'error': page_result.error})
+    
+    summary = accumulator.summary()
+    summary['partial'] = crawl_result.truncated
+    summary['page_errors'] = page_errors
+    summary['scan_mode'] = scan_mode
+    if escalation_reasons:
+        summary['escalation_reasons'] = escalation_reasons
+    if blocker is not None:
+        summary['lightweight'] = blocker.stats()
+    
+    end_time = datetime.now()
+    scan_duration = (end_time - start_time).total_seconds()
+    
+    result = {
+        'scan_id': scan_id,
+        'target_url': url,
+        'timestamp': start_time.isoformat(),
+        'resources': accumulator.resources(),
+        'summary': summary,
+        'scan_duration': scan_duration,
+        'pages_scanned': crawl_result.pages_scanned
+    }
+    if include_timings:
+        result['timings'] = timer.breakdown()
+    return result
+
+async def persist_result(content: Dict[str, Any]) -> None:
+    """Save a completed scan so it can be fetched with GET /scan/{scan_id}"""
+    now = datetime.now().timestamp()
+    await scan_store.put(content['scan_id'], {
+        'scan_id': content['scan_id'],
+        'status': STATUS_COMPLETED,
+        'target_url': content['target_url'],
+        'created_at': now,
+        'updated_at': now,
+        'result': content
+    })
+
+async def run_scan(
+    url: str,
+    request: ScanRequest,
+    scan_id: Optional[str] = None,
+    on_resource: Optional[Callable[[Resource], None]] = None,
+    admitted: bool = False
+) -> Dict[str, Any]:
+    """
+    Run scan_website with the options carried by a ScanRequest, recording scan metrics
+
+    Unless the caller already holds one (``admitted``), the scan first takes an
+    admission slot, which raises AdmissionRejected when the wait queue is full.
+    """
+    if not admitted:
+        async with admission.slot(extract_domain(url)):
+            return await run_scan(url, request, scan_id, on_resource, admitted=True)
+    
+    # Incremental rescans compare against the site's stored fingerprint; batch
+    # worker processes have no store and always scan in full
+    rescan = None
+    if request.incremental and scan_store is not None:
+        rescan = RescanTracker(await scan_store.get_fingerprint(scan_key(url, request)))
+    
+    with SCANS_IN_FLIGHT.track_inprogress():
         try:
-            # Scan the main page
-            all_resources = []
-            pages_scanned = 0
-            
-            # Scan main page
-            resources = await scan_page(page, url)
-            all_resources.extend(resources)
-            pages_scanned += 1
-            
-            # TODO: Implement recursive scanning for depth > 1
-            # This would involve finding links on the page and scanning them
-            
-            # Create summary
-            resource_summary = {}
-            risk_summary = {'low': 0, 'medium': 0, 'high': 0, 'critical': 0}
-            category_summary = {}
-            
-            for resource in all_resources:
-                # Count by type
-                resource_summary[resource.type] = resource_summary.get(resource.type, 0) + 1
-                
-                # Count by risk
-                risk_summary[resource.risk_level] = risk_summary.get(resource.risk_level, 0) + 1
-                
-                # Count by category
-                category_summary[resource.category] = category_summary.get(resource.category, 0) + 1
-            
-            end_time = datetime.now()
-            scan_duration = (end_time - start_time).total_seconds()
-            
-            return ScanResult(
+            result = await scan_website(
+                url,
+                request.depth,
+                request.timeout,
                 scan_id=scan_id,
-                target_url=url,
-                timestamp=start_time.isoformat(),
-                resources=all_resources,
-                summary={
-                    'total_resources': len(all_resources),
-                    'by_type': resource_summary,
-                    'by_risk': risk_summary,
-                    'by_category': category_summary,
-                    'unique_hosts': len(set(r.host for r in all_resources))
-                },
-                scan_duration=scan_duration,
-                pages_scanned=pages_scanned
+                lightweight=request.lightweight,
+                block_resource_types=request.block_resource_types,
+                mode=request.mode,
+                on_resource=on_resource,
+                include_timings=request.include_timings,
+                rescan=rescan
             )
-            
-        finally:
-            await browser.close()
+        except asyncio.CancelledError:
+            SCANS_TOTAL.labels('cancelled').inc()
+            raise
+        except Exception:
+            SCANS_TOTAL.labels('failed').inc()
+            raise
+    record_scan(result)
+    if rescan is not None:
+        await apply_rescan(url, request, result, rescan)
+    return result
+
+async def apply_rescan(url: str, request: ScanRequest, result: Dict[str, Any], rescan: RescanTracker) -> None:
+    """Store the new fingerprint and replace the resource list with the delta against the baseline"""
+    fingerprint = rescan.fingerprint(result, result['resources'])
+    delta = rescan.delta(fingerprint)
+    # A truncated scan or a page that failed to load would report unscanned
+    # pages' resources as removed next time
+    delta['partial'] = result['summary']['partial'] or bool(rescan.failed)
+    delta['baseline_updated'] = not delta['partial']
+    if delta['baseline_updated']:
+        await scan_store.put_fingerprint(scan_key(url, request), fingerprint)
+    result['delta'] = delta
+    if rescan.baseline is not None:
+        result['resources'] = []
+
+def scan_key(url: str, request: ScanRequest, **params: Any) -> str:
+    """Cache and fingerprint key: URL plus every request option that changes the findings"""
+    key_params = {'mode': request.mode, **params}
+    if request.lightweight:
+        key_params['blocked'] = ','.join(request.block_resource_types)
+    return cache_key(url, request.depth, **key_params)
+
+async def cached_scan(url: str, request: ScanRequest, use_cache: bool = True) -> Tuple[Dict[str, Any], str]:
+    """Serve a scan from the result cache, scanning (once per key) on a miss or stale hit"""
+    async def fresh_scan() -> Dict[str, Any]:
+        content = await run_scan(url, request)
+        await persist_result(content)
+        return content
+    
+    # Incremental results depend on the stored baseline, so they are never cached
+    if not use_cache or request.incremental:
+        return await fresh_scan(), CACHE_BYPASS
+    key_params = {'timings': 1} if request.include_timings else {}
+    return await scan_cache.get_or_scan(scan_key(url, request, **key_params), fresh_scan)
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "scanner", "version": "1.0.0"}
+    return {
+        "status": "healthy",
+        "service": "scanner",
+        "version": "1.0.0",
+        "browser_pool": await asyncio.to_thread(browser_pool.stats),
+        "admission": admission.stats(),
+        "jobs": scan_jobs.stats() if scan_jobs else None,
+        "cache": scan_cache.stats(),
+        "batch": batch_scanner.stats()
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics for this process (batch worker processes are not included)"""
+    pool_stats = await asyncio.to_thread(browser_pool.stats)
+    content, content_type = await asyncio.to_thread(render_metrics, pool_stats)
+    return Response(content=content, headers={'Content-Type': content_type})
+
+class ClientDisconnected(Exception):
+    """The client went away before its synchronous scan finished"""
+
+async def run_until_disconnect(http_request: Request, awaitable) -> Any:
+    """Await awaitable, cancelling it if the client disconnects first"""
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                raise ClientDisconnected()
+    finally:
+        task.cancel()
+
+def too_many_requests(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(e), headers={'Retry-After': str(e.retry_after)})
 
 @app.post("/scan", response_model=ScanResult)
-async def scan_site(request: ScanRequest, background_tasks: BackgroundTasks):
+async def scan_site(
+    request: ScanRequest,
+    background_tasks: BackgroundTasks,
+    http_request: Request,
+    wait: bool = True,
+    cache: bool = True
+):
     """
     Scan a website for third-party scripts, cookies, and trackers
+
+    With ``wait=false`` the scan is queued and 202 is returned immediately with
+    the scan id; poll ``GET /scan/{scan_id}`` for the result. Synchronous scans
+    are served from the result cache unless ``cache=false``, wait for an
+    admission slot (429 with Retry-After when the wait queue is full) and are
+    cancelled if the client disconnects.
     """
     try:
         # Validate URL
@@ -377,33 +851,176 @@ async def scan_site(request: ScanRequest, background_tasks: BackgroundTasks):
         if not url.startswith(('http://', 'https://')):
             raise HTTPException(status_code=400, detail="URL must start with http:// or https://")
         
+        if not wait:
+            record = await scan_jobs.submit({**request.dict(), 'url': url})
+            return FastJSONResponse(
+                status_code=202,
+                content={
+                    'scan_id': record['scan_id'],
+                    'status': record['status'],
+                    'target_url': url,
+                    'status_url': f"/scan/{record['scan_id']}"
+                },
+                headers={'Location': f"/scan/{record['scan_id']}"}
+            )
+        
         # Perform scan
-        result = await scan_website(url, request.depth, request.timeout)
+        content, cache_status = await run_until_disconnect(
+            http_request, cached_scan(url, request, use_cache=cache)
+        )
         
         # Log scan completion (background task)
         background_tasks.add_task(
-            print, 
-            f"Scan completed: {result.scan_id} for {url} - {len(result.resources)} resources found"
+            logger.info,
+            "scan_completed",
+            scan_id=content['scan_id'],
+            url=url,
+            resources=len(content['resources']),
+            cache=cache_status
         )
         
-        return JSONResponse(
-            status_code=200,
-            content=result.dict()
-        )
+        with timed_phase('serialize'):
+            return FastJSONResponse(
+                status_code=200,
+                content=content,
+                headers={'X-Cache': cache_status.upper()}
+            )
         
+    except HTTPException:
+        raise
+    except ClientDisconnected:
+        logger.info("scan_cancelled", url=url, reason="client disconnected")
+        return Response(status_code=499)
+    except AdmissionRejected as e:
+        raise too_many_requests(e)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={'Retry-After': str(admission.retry_after())})
+    except PoolTimeoutError:
+        raise HTTPException(status_code=503, detail="Scanner busy - no browser available, retry later")
     except asyncio.TimeoutError:
         raise HTTPException(status_code=408, detail="Scan timeout - the website took too long to load")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scan failed: {str(e)}")
 
+def stream_record(record: Dict[str, Any], stream_format: str) -> str:
+    """Frame one record as an NDJSON line or a server-sent event"""
+    data = dumps(record).decode('utf-8')
+    if stream_format == 'sse':
+        return f"event: {record['type']}\ndata: {data}\n\n"
+    return data + "\n"
+
+@app.post("/scan/stream")
+async def scan_stream(request: ScanRequest, format: str = 'ndjson'):
+    """
+    Scan a website and stream third-party resources as they are discovered
+
+    Emits a ``start`` record, one ``resource`` record per unique resource and a
+    closing ``summary`` (or ``error``) record, as NDJSON or server-sent events
+    depending on ``format``. Streamed scans are neither cached nor persisted.
+    """
+    url = str(request.url)
+    if not url.startswith(('http://', 'https://')):
+        raise HTTPException(status_code=400, detail="URL must start with http:// or https://")
+    if format not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format must be one of {list(STREAM_FORMATS)}")
+    if request.incremental:
+        raise HTTPException(status_code=400, detail="Incremental scans cannot be streamed; use POST /scan")
+    try:
+        admission.check_capacity(extract_domain(url))
+    except AdmissionRejected as e:
+        raise too_many_requests(e)
+    
+    scan_id = new_scan_id()
+    records: asyncio.Queue = asyncio.Queue()
+    
+    def on_resource(resource: Resource) -> None:
+        records.put_nowait({'type': 'resource', 'resource': resource.as_dict()})
+    
+    async def produce() -> None:
+        try:
+            result = await run_scan(url, request, scan_id=scan_id, on_resource=on_resource)
+            records.put_nowait({
+                'type': 'summary',
+                'scan_id': scan_id,
+                'summary': result['summary'],
+                'pages_scanned': result['pages_scanned'],
+                'scan_duration': result['scan_duration']
+            })
+        except (PoolTimeoutError, AdmissionRejected):
+            records.put_nowait({'type': 'error', 'scan_id': scan_id, 'error': "Scanner busy - no browser available, retry later"})
+        except Exception as e:
+            records.put_nowait({'type': 'error', 'scan_id': scan_id, 'error': f"Scan failed: {str(e)}"})
+    
+    async def stream():
+        producer = asyncio.create_task(produce())
+        try:
+            yield stream_record({'type': 'start', 'scan_id': scan_id, 'target_url': url}, format)
+            while True:
+                record = await records.get()
+                yield stream_record(record, format)
+                if record['type'] != 'resource':
+                    break
+        finally:
+            # Client went away (or the scan ended): stop scanning and release the browser
+            producer.cancel()
+    
+    return StreamingResponse(
+        stream(),
+        media_type=STREAM_FORMATS[format],
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.post("/scan/batch", response_model=BatchScanResponse)
+async def scan_batch(request: BatchScanRequest):
+    """
+    Scan many websites at once, sharded across browser-owning worker processes
+    """
+    start_time = datetime.now()
+    params = [{**scan.dict(), 'url': str(scan.url)} for scan in request.scans]
+    outcomes = await batch_scanner.run(params)
+    
+    # Items are built as plain dicts in the BatchScanItem shape; re-validating
+    # every scan result through pydantic would dominate large batches
+    results = []
+    for scan_params, (ok, payload) in zip(params, outcomes):
+        if ok:
+            await persist_result(payload)
+            results.append({'url': scan_params['url'], 'status': STATUS_COMPLETED, 'result': payload, 'error': None})
+        else:
+            results.append({'url': scan_params['url'], 'status': STATUS_FAILED, 'result': None, 'error': payload})
+    
+    completed = sum(1 for item in results if item['status'] == STATUS_COMPLETED)
+    return FastJSONResponse(status_code=200, content={
+        'total': len(results),
+        'completed': completed,
+        'failed': len(results) - completed,
+        'results': results,
+        'duration': (datetime.now() - start_time).total_seconds()
+    })
+
 @app.get("/scan/{scan_id}")
 async def get_scan_result(scan_id: str):
     """
-    Retrieve a previous scan result
+    Retrieve a previous scan result, or the status of a queued/running scan
     """
-    # TODO: Implement scan result storage/retrieval
-    # For now, return not found
-    raise HTTPException(status_code=404, detail="Scan result not found")
+    record = await scan_store.get(scan_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Scan result not found")
+    
+    if record['status'] == STATUS_COMPLETED:
+        return FastJSONResponse(status_code=200, content=record['result'])
+    
+    content = {
+        'scan_id': scan_id,
+        'status': record['status'],
+        'target_url': record.get('target_url'),
+        'created_at': record.get('created_at'),
+        'updated_at': record.get('updated_at')
+    }
+    if record['status'] == STATUS_FAILED:
+        content['error'] = record.get('error')
+        return FastJSONResponse(status_code=200, content=content)
+    return FastJSONResponse(status_code=202, content=content)
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", "8000"))
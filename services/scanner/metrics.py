@@ -0,0 +1,104 @@
+"""
+Metrics - phase timing and Prometheus metrics for the scanner
+Every scan phase is timed into a histogram and, optionally, into the scan's own breakdown
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# Phases timed across scan_website and scan_page
+SCAN_PHASES = (
+    'static_fetch',   # HTTP fetch and tokenizing of a page on the static path
+    'browser_lease',  # waiting for a pooled browser and opening a context
+    'goto',           # navigation up to DOMContentLoaded
+    'settle',         # waiting for network and DOM to go quiet
+    'cookies',        # reading the context's cookies
+    'extract',        # the page.evaluate DOM extraction
+    'classify',       # turning URLs into classified resources
+    'serialize',      # encoding the response body
+)
+
+PHASE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SCAN_BUCKETS = (0.5, 1, 2.5, 5, 10, 15, 30, 60, 120)
+
+PHASE_SECONDS = Histogram(
+    'scanner_phase_seconds', 'Time spent in each scan phase', ['phase'], buckets=PHASE_BUCKETS
+)
+SCAN_SECONDS = Histogram(
+    'scanner_scan_duration_seconds', 'End-to-end scan duration', ['scan_mode'], buckets=SCAN_BUCKETS
+)
+SCANS_TOTAL = Counter('scanner_scans_total', 'Scans finished, by outcome', ['outcome'])
+SCANS_IN_FLIGHT = Gauge('scanner_scans_in_flight', 'Scans currently running')
+PAGES_SCANNED = Counter('scanner_pages_scanned_total', 'Pages scanned', ['scan_mode'])
+RESOURCES_FOUND = Histogram(
+    'scanner_resources_per_scan', 'Unique third-party resources per scan',
+    buckets=(0, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+)
+BROWSER_LAUNCH_SECONDS = Histogram(
+    'scanner_browser_launch_seconds', 'Chromium launch time', buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10)
+)
+BROWSER_POOL_SLOTS = Gauge('scanner_browser_pool_slots', 'Browser context lease slots by state', ['state'])
+BROWSER_POOL_WAITING = Gauge('scanner_browser_pool_waiting', 'Scans waiting for a browser lease')
+CHROMIUM_RSS_BYTES = Gauge('scanner_chromium_rss_bytes', 'Resident memory of all pooled Chromium process trees')
+
+
+class PhaseTimer:
+    """
+    Times scan phases into PHASE_SECONDS and sums them per phase for one scan.
+
+    Pages of a crawl run concurrently, so per-phase sums can exceed the
+    scan's wall-clock duration.
+    """
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        PHASE_SECONDS.labels(name).observe(seconds)
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def breakdown(self) -> Dict[str, float]:
+        return {name: round(seconds, 4) for name, seconds in self.totals.items()}
+
+
+@contextmanager
+def timed_phase(name: str, timer: Optional[PhaseTimer] = None) -> Iterator[None]:
+    """Time a phase into the histogram, and into timer's breakdown when one is given"""
+    if timer is not None:
+        with timer.phase(name):
+            yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PHASE_SECONDS.labels(name).observe(time.perf_counter() - start)
+
+
+def record_scan(result: Dict[str, Any]) -> None:
+    summary = result['summary']
+    scan_mode = summary.get('scan_mode', 'browser')
+    SCAN_SECONDS.labels(scan_mode).observe(result['scan_duration'])
+    SCANS_TOTAL.labels('partial' if summary.get('partial') else 'completed').inc()
+    PAGES_SCANNED.labels(scan_mode).inc(result['pages_scanned'])
+    RESOURCES_FOUND.observe(summary['total_resources'])
+
+
+def render_metrics(pool_stats: Dict[str, Any]) -> Tuple[bytes, str]:
+    """Refresh scrape-time gauges from the browser pool and encode every metric"""
+    BROWSER_POOL_SLOTS.labels('idle').set(pool_stats['idle'])
+    BROWSER_POOL_SLOTS.labels('in_use').set(pool_stats['in_use'])
+    BROWSER_POOL_WAITING.set(pool_stats['waiting'])
+    CHROMIUM_RSS_BYTES.set(pool_stats['browser_rss_bytes'])
+    return generate_latest(), CONTENT_TYPE_LATEST
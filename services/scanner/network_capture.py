@@ -0,0 +1,106 @@
+"""
+Network Capture - passive recording of every request a page makes
+Attached before navigation; observes events only, never intercepts or routes requests
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+from playwright.async_api import Error as PlaywrightError, Page, Request
+
+# Collapse Playwright resource types onto the scanner's resource taxonomy
+RESOURCE_TYPE_MAP = {
+    'script': 'script',
+    'image': 'image',
+    'stylesheet': 'stylesheet',
+}
+
+# Everything the page renders from the DOM in a single round-trip
+EXTRACT_SCRIPT = """
+(collectLinks) => {
+    const declared = value => {
+        const size = parseInt(value, 10);
+        return Number.isNaN(size) ? null : size;
+    };
+    return {
+        scripts: Array.from(document.scripts, script => script.src).filter(Boolean),
+        images: Array.from(document.images, img => ({
+            src: img.src,
+            width: img.width,
+            height: img.height,
+            declaredWidth: declared(img.getAttribute('width') || img.style.width),
+            declaredHeight: declared(img.getAttribute('height') || img.style.height)
+        })).filter(img => img.src),
+        iframes: Array.from(document.querySelectorAll('iframe'), iframe => iframe.src).filter(Boolean),
+        links: collectLinks ? Array.from(document.links, link => link.href).filter(Boolean) : []
+    };
+}
+"""
+
+
+@dataclass
+class CapturedRequest:
+    url: str
+    resource_type: str
+    count: int = 1
+
+
+class NetworkCapture:
+    """
+    Records unique request URLs with their Playwright resource type.
+
+    ``on_capture`` is called the first time each URL is seen. Main-frame
+    navigations (the document and each of its redirect hops) are the page
+    itself: they are not recorded, and their hosts are collected in
+    ``navigation_hosts`` so callers can treat them as first party.
+    """
+
+    def __init__(
+        self,
+        page: Page,
+        max_requests: int = 5000,
+        on_capture: Optional[Callable[[CapturedRequest], None]] = None
+    ):
+        self.page = page
+        self.max_requests = max_requests
+        self.on_capture = on_capture
+        self.requests: Dict[str, CapturedRequest] = {}
+        self.navigation_hosts: Set[str] = set()
+        self.dropped = 0
+
+    def attach(self) -> 'NetworkCapture':
+        self.page.on('request', self._on_request)
+        return self
+
+    def _on_request(self, request: Request) -> None:
+        url = request.url
+        if not url.startswith(('http://', 'https://')):
+            return
+        if request.is_navigation_request() and self._in_main_frame(request):
+            self.navigation_hosts.add(urlparse(url).netloc.lower())
+            return
+        captured = self.requests.get(url)
+        if captured is not None:
+            captured.count += 1
+        elif len(self.requests) < self.max_requests:
+            captured = CapturedRequest(url, RESOURCE_TYPE_MAP.get(request.resource_type, 'network_request'))
+            self.requests[url] = captured
+            if self.on_capture is not None:
+                self.on_capture(captured)
+        else:
+            self.dropped += 1
+
+    def _in_main_frame(self, request: Request) -> bool:
+        try:
+            return request.frame == self.page.main_frame
+        except PlaywrightError:
+            return False  # service worker requests have no frame
+
+    def captured(self) -> List[CapturedRequest]:
+        return list(self.requests.values())
+
+
+async def extract_dom(page: Page, collect_links: bool = False) -> Dict[str, List]:
+    """Collect scripts, images, iframes and optionally links with one page.evaluate"""
+    return await page.evaluate(EXTRACT_SCRIPT, collect_links)
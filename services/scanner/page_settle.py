@@ -0,0 +1,97 @@
+"""
+Page Settle - adaptive detection of when a page has finished loading
+Watches in-flight requests and DOM mutations instead of sleeping a fixed time
+"""
+
+import asyncio
+from typing import Dict, Optional
+
+from playwright.async_api import Page, Request
+
+# Records the time of the last DOM mutation in every frame
+MUTATION_OBSERVER_SCRIPT = """
+(() => {
+    window.__scannerLastMutation = performance.now();
+    new MutationObserver(() => { window.__scannerLastMutation = performance.now(); })
+        .observe(document, { childList: true, subtree: true, attributes: true, characterData: true });
+})();
+"""
+
+DOM_QUIET_SCRIPT = "() => performance.now() - (window.__scannerLastMutation || 0)"
+
+
+class SettleTracker:
+    """
+    Tracks network and DOM activity of a page.
+
+    Must be attached before navigation. Requests that stay open longer than
+    ``long_request_ms`` (long-polling, streaming) stop counting as activity so
+    they cannot hold the page open until the deadline.
+    """
+
+    def __init__(
+        self,
+        page: Page,
+        quiet_ms: int = 500,
+        max_settle_ms: int = 10000,
+        long_request_ms: int = 5000,
+        poll_ms: int = 100,
+    ):
+        self.page = page
+        self.quiet = quiet_ms / 1000
+        self.max_settle = max_settle_ms / 1000
+        self.long_request = long_request_ms / 1000
+        self.poll = poll_ms / 1000
+        self._loop = asyncio.get_running_loop()
+        self._inflight: Dict[Request, float] = {}
+        self._last_activity = self._loop.time()
+
+    async def attach(self) -> 'SettleTracker':
+        await self.page.add_init_script(MUTATION_OBSERVER_SCRIPT)
+        self.page.on('request', self._on_request)
+        self.page.on('requestfinished', self._on_request_done)
+        self.page.on('requestfailed', self._on_request_done)
+        return self
+
+    def _on_request(self, request: Request) -> None:
+        now = self._loop.time()
+        self._inflight[request] = now
+        self._last_activity = now
+
+    def _on_request_done(self, request: Request) -> None:
+        self._inflight.pop(request, None)
+        self._last_activity = self._loop.time()
+
+    def network_quiet_for(self, now: float) -> float:
+        """Seconds since the last network activity, ignoring long-lived requests"""
+        for started in self._inflight.values():
+            if now - started < self.long_request:
+                return 0.0
+        return now - self._last_activity
+
+    async def dom_quiet_for(self) -> float:
+        """Seconds since the last DOM mutation in the main frame"""
+        try:
+            return (await self.page.evaluate(DOM_QUIET_SCRIPT)) / 1000
+        except Exception:
+            # Navigation in progress or the frame went away; treat as not quiet
+            return 0.0
+
+    async def wait(self, deadline: Optional[float] = None) -> bool:
+        """
+        Wait until network and DOM have both been quiet for the quiet window.
+
+        Returns True once settled, or False if max_settle or the scan deadline
+        (an event loop timestamp) was reached first.
+        """
+        end = self._loop.time() + self.max_settle
+        if deadline is not None:
+            end = min(end, deadline)
+
+        while True:
+            now = self._loop.time()
+            if now >= end:
+                return False
+            if self.network_quiet_for(now) >= self.quiet and await self.dom_quiet_for() >= self.quiet:
+                return True
+            await asyncio.sleep(min(self.poll, max(0.0, end - now)))
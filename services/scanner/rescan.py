@@ -0,0 +1,168 @@
+"""
+Rescan - per-site fingerprints and resource deltas for incremental rescans
+Pages whose validators or content hash are unchanged reuse their previous findings
+"""
+
+import hashlib
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from scan_summary import Resource
+from static_scan import StaticFetcher, StaticPage
+
+# Fields compared for resources present in both scans; occurrences are too noisy to count
+CHANGE_FIELDS = ('risk_level', 'category', 'description')
+
+
+def hash_strings(values: Iterable[str]) -> str:
+    """Order-independent hash of a set of strings"""
+    digest = hashlib.sha256()
+    for value in sorted(set(values)):
+        digest.update(value.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def resource_key(resource: Dict[str, Any]) -> str:
+    return f"{resource['type']} {resource['host']} {resource['url']}"
+
+
+def diff_resources(before: List[Dict[str, Any]], after: List[Dict[str, Any]]) -> Dict[str, List]:
+    """Resources added, removed and changed between two scans, matched by (type, host, url)"""
+    previous = {resource_key(resource): resource for resource in before}
+    current = {resource_key(resource): resource for resource in after}
+    changed = []
+    for key in previous.keys() & current.keys():
+        if any(previous[key].get(name) != current[key].get(name) for name in CHANGE_FIELDS):
+            changed.append({'before': previous[key], 'after': current[key]})
+    return {
+        'added': [current[key] for key in current.keys() - previous.keys()],
+        'removed': [previous[key] for key in previous.keys() - current.keys()],
+        'changed': changed,
+    }
+
+
+class RescanTracker:
+    """
+    Collects page fingerprints during one scan and compares them with the baseline.
+
+    A page record holds the document's ETag/Last-Modified, a hash of its HTML,
+    hashes of its script set and of its whole resource set, and the page's own
+    resources and links so an unchanged page can be replayed without scanning.
+    """
+
+    def __init__(self, baseline: Optional[Dict[str, Any]] = None):
+        self.baseline = baseline
+        self._baseline_pages: Dict[str, Dict[str, Any]] = (baseline or {}).get('pages', {})
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.reused: List[str] = []
+        self.failed: List[str] = []
+        self._fetched: Dict[str, StaticPage] = {}
+
+    def remember_fetch(self, page_url: str, page: StaticPage) -> None:
+        """Keep a page already fetched this scan so it is not fetched again"""
+        self._fetched[page_url] = page
+
+    def fetched(self, page_url: str) -> Optional[StaticPage]:
+        return self._fetched.get(page_url)
+
+    async def revalidate(self, page_url: str, fetcher: StaticFetcher, timeout: float) -> Optional[Dict[str, Any]]:
+        """Return the baseline record for page_url if the page is unchanged since, else None"""
+        prior = self._baseline_pages.get(page_url)
+        if prior is None:
+            return None
+        page = self._fetched.get(page_url)
+        if page is None:
+            page = await fetcher.fetch(
+                page_url,
+                timeout=timeout,
+                etag=prior.get('etag'),
+                last_modified=prior.get('last_modified')
+            )
+            if not page.not_modified:
+                self._fetched[page_url] = page
+        if page.error:
+            return None
+        if page.not_modified or (page.content_hash and page.content_hash == prior.get('content_hash')):
+            return prior
+        return None
+
+    def reuse(self, page_url: str, prior: Dict[str, Any]) -> List[Resource]:
+        """Carry an unchanged page's record over and return its resources"""
+        self.pages[page_url] = prior
+        self.reused.append(page_url)
+        return [Resource(*fields) for fields in prior['resources']]
+
+    def fail(self, page_url: str) -> List[Resource]:
+        """Carry a page that failed to load over from the baseline and return its resources"""
+        self.failed.append(page_url)
+        prior = self._baseline_pages.get(page_url)
+        if prior is None:
+            return []
+        self.pages[page_url] = prior
+        return [Resource(*fields) for fields in prior['resources']]
+
+    def record(
+        self,
+        page_url: str,
+        resources: List[Resource],
+        links: List[str],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        content_hash: Optional[str] = None
+    ) -> None:
+        # Fold the page's own duplicates (e.g. a script seen in the DOM and on the network)
+        unique: Dict[tuple, Resource] = {}
+        for resource in resources:
+            seen = unique.get(resource.key)
+            unique[resource.key] = resource if seen is None else \
+                seen._replace(occurrences=seen.occurrences + resource.occurrences)
+        self.pages[page_url] = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_hash': content_hash,
+            'script_hash': hash_strings(r.url for r in unique.values() if r.type == 'script'),
+            'dom_hash': hash_strings(' '.join(key) for key in unique),
+            'resources': [list(resource) for resource in unique.values()],
+            'links': links,
+        }
+
+    def fingerprint(self, result: Dict[str, Any], resources: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """The site fingerprint to store for the next rescan"""
+        return {
+            'scan_id': result['scan_id'],
+            'timestamp': result['timestamp'],
+            'stored_at': time.time(),
+            'resource_set_hash': hash_strings(resource_key(resource) for resource in resources),
+            'resources': resources,
+            'pages': self.pages,
+        }
+
+    def delta(self, fingerprint: Dict[str, Any]) -> Dict[str, Any]:
+        """Changes since the baseline; only page counts when there is none yet"""
+        baseline = self.baseline
+        if baseline is None:
+            return {
+                'baseline_scan_id': None,
+                'resource_set_hash': fingerprint['resource_set_hash'],
+                'pages_reused': 0,
+                'pages_rescanned': len(self.pages),
+                'pages_failed': sorted(self.failed),
+            }
+        pages_changed = sorted(
+            url for url, page in self.pages.items()
+            if url in self._baseline_pages and page['dom_hash'] != self._baseline_pages[url]['dom_hash']
+        )
+        return {
+            'baseline_scan_id': baseline['scan_id'],
+            'baseline_timestamp': baseline['timestamp'],
+            'unchanged': fingerprint['resource_set_hash'] == baseline['resource_set_hash'],
+            'resource_set_hash': fingerprint['resource_set_hash'],
+            'pages_reused': len(self.reused),
+            'pages_rescanned': len(self.pages.keys() - self.reused - set(self.failed)),
+            'pages_failed': sorted(self.failed),
+            'pages_changed': pages_changed,
+            'pages_added': sorted(self.pages.keys() - self._baseline_pages.keys()),
+            'pages_removed': sorted(self._baseline_pages.keys() - self.pages.keys()),
+            **diff_resources(baseline['resources'], fingerprint['resources']),
+        }
@@ -0,0 +1,247 @@
+"""
+Scan Cache - LRU + TTL cache of scan results with stale-while-revalidate
+Coalesces concurrent identical scans and optionally persists entries to disk
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import structlog
+
+from crawler import normalize_url
+
+logger = structlog.get_logger(__name__)
+
+# Cache outcomes, reported to callers and in the X-Cache response header
+CACHE_HIT = 'hit'
+CACHE_STALE = 'stale'
+CACHE_MISS = 'miss'
+CACHE_COALESCED = 'coalesced'
+CACHE_BYPASS = 'bypass'
+
+ScanFn = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+def cache_key(url: str, depth: int, **params: Any) -> str:
+    """Key on the canonicalized URL, depth and any other result-affecting parameters"""
+    parts = [normalize_url(url) or url, f"depth={depth}"]
+    parts.extend(f"{name}={params[name]}" for name in sorted(params))
+    return '|'.join(parts)
+
+
+class ScanCache:
+    """
+    In-memory LRU of scan results with an optional on-disk tier.
+
+    Entries are fresh for ``ttl`` seconds and may be served stale for a
+    further ``stale_ttl`` seconds while a single background refresh runs.
+    Results for which ``cacheable`` returns False are handed to their callers
+    but never stored. The disk tier is held to the same bounds: expired files
+    and the least recently written ones beyond ``max_entries`` are removed at
+    startup and after every disk write.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl: float = 900,
+        stale_ttl: float = 3600,
+        disk_dir: Optional[str] = None,
+        cacheable: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.disk_dir = disk_dir
+        self.cacheable = cacheable
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+        self._entries: 'OrderedDict[str, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self._refreshing: set = set()
+        self._counters = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'refreshes': 0,
+            'disk_hits': 0,
+            'evictions': 0,
+            'errors': 0,
+            'abandoned': 0,
+            'uncacheable': 0,
+            'disk_evictions': 0,
+        }
+        if disk_dir:
+            self._sweep_disk()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, hashlib.sha256(key.encode()).hexdigest() + '.json')
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if stored.get('key') != key:
+            return None
+        if time.time() - stored['stored_at'] > self.ttl + self.stale_ttl:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return stored['stored_at'], stored['value']
+
+    def _write_disk(self, key: str, stored_at: float, value: Dict[str, Any]) -> None:
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'stored_at': stored_at, 'value': value}, f)
+        os.replace(tmp_path, path)
+        self._sweep_disk()
+
+    def _sweep_disk(self) -> None:
+        """Remove expired entry files and the oldest ones beyond max_entries"""
+        cutoff = time.time() - (self.ttl + self.stale_ttl)
+        entries = []
+        with os.scandir(self.disk_dir) as scan:
+            for entry in scan:
+                if not entry.name.endswith(('.json', '.tmp')):
+                    continue
+                try:
+                    mtime = entry.stat().st_mtime
+                except OSError:
+                    continue
+                if mtime < cutoff:
+                    # A file's mtime is when its entry was stored
+                    self._remove_disk_file(entry.path)
+                elif entry.name.endswith('.json'):
+                    entries.append((mtime, entry.path))
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+            self._remove_disk_file(path)
+
+    def _remove_disk_file(self, path: str) -> None:
+        try:
+            os.remove(path)
+            self._counters['disk_evictions'] += 1
+        except OSError:
+            pass
+
+    async def _lookup(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self.disk_dir:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            if entry is not None:
+                self._counters['disk_hits'] += 1
+                self._store_memory(key, *entry)
+            return entry
+        return None
+
+    def _store_memory(self, key: str, stored_at: float, value: Dict[str, Any]) -> None:
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters['evictions'] += 1
+
+    async def _run(self, key: str, scan_fn: ScanFn) -> Dict[str, Any]:
+        """Run the scan once and store its result; concurrent callers share this task"""
+        try:
+            value = await scan_fn()
+            if self.cacheable is not None and not self.cacheable(value):
+                self._counters['uncacheable'] += 1
+                return value
+            stored_at = time.time()
+            self._store_memory(key, stored_at, value)
+            if self.disk_dir:
+                try:
+                    await asyncio.to_thread(self._write_disk, key, stored_at, value)
+                except OSError as e:
+                    logger.warning("scan_cache_disk_write_failed", key=key, error=str(e))
+            return value
+        except Exception:
+            self._counters['errors'] += 1
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            self._refreshing.discard(key)
+
+    def _start(self, key: str, scan_fn: ScanFn) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run(key, scan_fn))
+            self._inflight[key] = task
+        return task
+
+    async def get_or_scan(self, key: str, scan_fn: ScanFn) -> Tuple[Dict[str, Any], str]:
+        """Return (result, cache outcome), scanning only when no usable entry exists"""
+        if not self.enabled:
+            return await scan_fn(), CACHE_BYPASS
+
+        entry = await self._lookup(key)
+        if entry is not None:
+            stored_at, value = entry
+            age = time.time() - stored_at
+            if age <= self.ttl:
+                self._counters['hits'] += 1
+                return value, CACHE_HIT
+            if age <= self.ttl + self.stale_ttl:
+                self._counters['stale_hits'] += 1
+                if key not in self._inflight:
+                    self._counters['refreshes'] += 1
+                    self._refreshing.add(key)
+                    task = self._start(key, scan_fn)
+                    # Refresh failures are counted in _run; keep them out of the event loop's error log
+                    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                return value, CACHE_STALE
+
+        if key in self._inflight:
+            self._counters['coalesced'] += 1
+            return await self._join(key, self._inflight[key]), CACHE_COALESCED
+
+        self._counters['misses'] += 1
+        return await self._join(key, self._start(key, scan_fn)), CACHE_MISS
+
+    async def _join(self, key: str, task: asyncio.Task) -> Dict[str, Any]:
+        """Wait for a shared scan; the scan is cancelled once every waiter has gone away"""
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+                # Background refreshes keep running; they have no caller to lose
+                if not task.done() and key not in self._refreshing:
+                    self._counters['abandoned'] += 1
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'stale_ttl': self.stale_ttl,
+            'disk': bool(self.disk_dir),
+            'in_flight': len(self._inflight),
+            **self._counters,
+        }
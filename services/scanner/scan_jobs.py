@@ -0,0 +1,111 @@
+"""
+Scan Jobs - in-process worker queue for asynchronous scans
+Accepted scans are recorded in a ScanStore and run by a fixed set of workers
+"""
+
+import asyncio
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from scan_store import ScanStore, STATUS_COMPLETED, STATUS_FAILED, STATUS_QUEUED, STATUS_RUNNING
+
+# Runs one scan and returns its JSON-serializable result
+ScanRunner = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue cannot accept more scans"""
+
+
+def new_scan_id() -> str:
+    """Collision-free scan id that still sorts by creation time"""
+    return f"scan_{int(time.time())}_{uuid.uuid4().hex[:12]}"
+
+
+class ScanJobQueue:
+    """Bounded queue of scan jobs drained by a fixed number of worker tasks"""
+
+    def __init__(self, store: ScanStore, runner: ScanRunner, workers: int = 2, max_queued: int = 100):
+        self.store = store
+        self.runner = runner
+        self.workers = workers
+        self.max_queued = max_queued
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Submissions holding a queue place while their record is being stored
+        self._reserved = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._interrupted = 0
+
+    async def start(self) -> None:
+        """Fail jobs a previous process left unfinished, then start the workers"""
+        # Their in-memory queue entries died with that process, so they would never run
+        interrupted = await self.store.fail_unfinished('Scan interrupted by a service restart')
+        self._interrupted += len(interrupted)
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, params: Dict[str, Any], scan_id: Optional[str] = None) -> Dict[str, Any]:
+        """Record a queued job and hand it to the workers"""
+        if self._queue is None:
+            raise RuntimeError("Scan job queue is not started")
+        if self._queue.qsize() + self._reserved >= self.max_queued:
+            raise QueueFullError(f"Scan queue is full ({self.max_queued} jobs waiting)")
+
+        # Hold the place across the store write so concurrent submits cannot overfill the queue
+        self._reserved += 1
+        scan_id = scan_id or new_scan_id()
+        now = time.time()
+        record = {
+            'scan_id': scan_id,
+            'status': STATUS_QUEUED,
+            'target_url': params.get('url'),
+            'params': params,
+            'created_at': now,
+            'updated_at': now,
+        }
+        try:
+            await self.store.put(scan_id, record)
+        finally:
+            self._reserved -= 1
+        self._queue.put_nowait((scan_id, params))
+        return record
+
+    async def _worker(self) -> None:
+        while True:
+            scan_id, params = await self._queue.get()
+            self._running += 1
+            try:
+                await self.store.update(scan_id, status=STATUS_RUNNING, started_at=time.time())
+                result = await self.runner(scan_id, params)
+                await self.store.update(scan_id, status=STATUS_COMPLETED, result=result)
+                self._completed += 1
+            except asyncio.CancelledError:
+                await self.store.update(scan_id, status=STATUS_FAILED, error='Scan cancelled')
+                raise
+            except Exception as e:
+                self._failed += 1
+                await self.store.update(scan_id, status=STATUS_FAILED, error=str(e))
+            finally:
+                self._running -= 1
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'workers': self.workers,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'max_queued': self.max_queued,
+            'running': self._running,
+            'completed': self._completed,
+            'failed': self._failed,
+            'interrupted': self._interrupted,
+        }
@@ -0,0 +1,227 @@
+"""
+Scan Store - pluggable persistence for scan job status and results
+Ships an in-memory backend and a local SQLite backend that works offline
+"""
+
+import abc
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Job lifecycle states
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_COMPLETED = 'completed'
+STATUS_FAILED = 'failed'
+
+# States a job is in while the process that owns it is still working on it
+UNFINISHED_STATUSES = (STATUS_QUEUED, STATUS_RUNNING)
+
+# Expired SQLite rows are purged at startup and again after this many writes
+PURGE_EVERY_WRITES = 500
+
+
+def failed_record(record: Dict[str, Any], error: str) -> Dict[str, Any]:
+    return {**record, 'status': STATUS_FAILED, 'error': error, 'updated_at': time.time()}
+
+
+class ScanStore(abc.ABC):
+    """Interface for scan record storage; records are plain JSON-serializable dicts"""
+
+    @abc.abstractmethod
+    async def put(self, scan_id: str, record: Dict[str, Any]) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def get(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abc.abstractmethod
+    async def fail_unfinished(self, error: str) -> List[str]:
+        """Mark every queued or running record failed with error; returns their scan ids"""
+
+    async def update(self, scan_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        """Merge fields into an existing record and return it"""
+        record = await self.get(scan_id)
+        if record is None:
+            return None
+        record.update(fields)
+        record['updated_at'] = time.time()
+        await self.put(scan_id, record)
+        return record
+
+    @abc.abstractmethod
+    async def get_fingerprint(self, site: str) -> Optional[Dict[str, Any]]:
+        """Fingerprint of the last complete scan of site, for incremental rescans"""
+
+    @abc.abstractmethod
+    async def put_fingerprint(self, site: str, fingerprint: Dict[str, Any]) -> None:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryScanStore(ScanStore):
+    """Process-local store, bounded to the most recent max_records scans"""
+
+    def __init__(self, max_records: int = 1000):
+        self.max_records = max_records
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._fingerprints: Dict[str, Dict[str, Any]] = {}
+
+    async def put(self, scan_id: str, record: Dict[str, Any]) -> None:
+        self._records.pop(scan_id, None)
+        self._records[scan_id] = dict(record)
+        while len(self._records) > self.max_records:
+            self._records.pop(next(iter(self._records)))
+
+    async def get(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        record = self._records.get(scan_id)
+        return dict(record) if record is not None else None
+
+    async def fail_unfinished(self, error: str) -> List[str]:
+        scan_ids = [scan_id for scan_id, record in self._records.items() if record.get('status') in UNFINISHED_STATUSES]
+        for scan_id in scan_ids:
+            self._records[scan_id] = failed_record(self._records[scan_id], error)
+        return scan_ids
+
+    async def get_fingerprint(self, site: str) -> Optional[Dict[str, Any]]:
+        return self._fingerprints.get(site)
+
+    async def put_fingerprint(self, site: str, fingerprint: Dict[str, Any]) -> None:
+        self._fingerprints.pop(site, None)
+        self._fingerprints[site] = fingerprint
+        while len(self._fingerprints) > self.max_records:
+            self._fingerprints.pop(next(iter(self._fingerprints)))
+
+
+class SQLiteScanStore(ScanStore):
+    """
+    Single-file SQLite store; blocking calls run in a worker thread.
+
+    Rows not updated for ``ttl_seconds`` are deleted when the store opens
+    and after every ``purge_every`` writes, so a long-running service does
+    not grow the file without bound.
+    """
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None, purge_every: int = PURGE_EVERY_WRITES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.purge_every = purge_every
+        self._writes = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS scans ('
+                ' scan_id TEXT PRIMARY KEY,'
+                ' status TEXT NOT NULL,'
+                ' updated_at REAL NOT NULL,'
+                ' record TEXT NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS scans_updated_at ON scans (updated_at)')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS fingerprints ('
+                ' site TEXT PRIMARY KEY,'
+                ' updated_at REAL NOT NULL,'
+                ' fingerprint TEXT NOT NULL)'
+            )
+            self._conn.commit()
+        self._purge_expired()
+
+    def _purge_expired(self) -> None:
+        if not self.ttl_seconds:
+            return
+        with self._lock:
+            cutoff = time.time() - self.ttl_seconds
+            self._conn.execute('DELETE FROM scans WHERE updated_at < ?', (cutoff,))
+            self._conn.execute('DELETE FROM fingerprints WHERE updated_at < ?', (cutoff,))
+            self._conn.commit()
+
+    def _count_write(self) -> None:
+        self._writes += 1
+        if self.purge_every and self._writes % self.purge_every == 0:
+            self._purge_expired()
+
+    def _put(self, scan_id: str, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO scans (scan_id, status, updated_at, record) VALUES (?, ?, ?, ?)',
+                (scan_id, record.get('status', ''), record.get('updated_at', time.time()), json.dumps(record))
+            )
+            self._conn.commit()
+        self._count_write()
+
+    def _get(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute('SELECT record FROM scans WHERE scan_id = ?', (scan_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _fail_unfinished(self, error: str) -> List[str]:
+        placeholders = ','.join('?' * len(UNFINISHED_STATUSES))
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT scan_id, record FROM scans WHERE status IN ({placeholders})', UNFINISHED_STATUSES
+            ).fetchall()
+            for scan_id, record in rows:
+                record = failed_record(json.loads(record), error)
+                self._conn.execute(
+                    'UPDATE scans SET status = ?, updated_at = ?, record = ? WHERE scan_id = ?',
+                    (record['status'], record['updated_at'], json.dumps(record), scan_id)
+                )
+            self._conn.commit()
+        return [scan_id for scan_id, _ in rows]
+
+    def _put_fingerprint(self, site: str, fingerprint: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO fingerprints (site, updated_at, fingerprint) VALUES (?, ?, ?)',
+                (site, time.time(), json.dumps(fingerprint))
+            )
+            self._conn.commit()
+        self._count_write()
+
+    def _get_fingerprint(self, site: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute('SELECT fingerprint FROM fingerprints WHERE site = ?', (site,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    async def put(self, scan_id: str, record: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._put, scan_id, record)
+
+    async def get(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get, scan_id)
+
+    async def fail_unfinished(self, error: str) -> List[str]:
+        return await asyncio.to_thread(self._fail_unfinished, error)
+
+    async def get_fingerprint(self, site: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get_fingerprint, site)
+
+    async def put_fingerprint(self, site: str, fingerprint: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._put_fingerprint, site, fingerprint)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_scan_store(url: str) -> ScanStore:
+    """
+    Build a store from a SCANNER_RESULT_STORE style URL:
+    ``memory://`` or ``sqlite:///path/to/scans.db``
+    """
+    if url.startswith('sqlite://'):
+        ttl_hours = float(os.getenv('SCANNER_RESULT_TTL_HOURS', '168'))
+        return SQLiteScanStore(url[len('sqlite://'):], ttl_seconds=ttl_hours * 3600 or None)
+    if url.startswith('memory://'):
+        return MemoryScanStore()
+    raise ValueError(f"Unsupported scan store URL: {url}")
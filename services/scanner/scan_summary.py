@@ -0,0 +1,110 @@
+"""
+Scan Summary - compact resource records, deduplication and incremental summary counts
+Resources are folded in as pages finish, so no final pass over all resources is needed
+"""
+
+import sys
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+ResourceKey = Tuple[str, str, str]
+
+
+class Resource(NamedTuple):
+    """
+    A discovered third-party resource.
+
+    Plain tuples are far cheaper than pydantic models for the thousands of
+    sightings an ad-heavy site produces; ThirdPartyResource is only the API
+    schema of ``as_dict()``'s output.
+    """
+    host: str
+    type: str
+    url: str
+    risk_level: str
+    description: str
+    category: str
+    occurrences: int = 1
+
+    @property
+    def key(self) -> ResourceKey:
+        return self.host, self.type, self.url
+
+    def as_dict(self, occurrences: Optional[int] = None) -> Dict[str, Any]:
+        record = self._asdict()
+        if occurrences is not None:
+            record['occurrences'] = occurrences
+        return record
+
+
+def make_resource(
+    host: str,
+    resource_type: str,
+    url: str,
+    risk_level: str,
+    description: str,
+    category: str,
+    occurrences: int = 1
+) -> Resource:
+    """Build a Resource, interning the low-cardinality strings repeated across records"""
+    return Resource(
+        sys.intern(host),
+        sys.intern(resource_type),
+        url,
+        sys.intern(risk_level),
+        description,
+        sys.intern(category),
+        occurrences
+    )
+
+
+class ResourceAccumulator:
+    """
+    Deduplicates resources by (host, type, url) and keeps summary counts up to date.
+
+    With ``keep_resources=False`` only keys and counters are retained, which is
+    what streaming scans use to avoid holding the whole result in memory.
+    """
+
+    def __init__(self, keep_resources: bool = True):
+        self.keep_resources = keep_resources
+        self._resources: Dict[ResourceKey, Resource] = {}
+        self._occurrences: Dict[ResourceKey, int] = {}
+        self._hosts = set()
+        self.by_type: Dict[str, int] = {}
+        self.by_risk: Dict[str, int] = {'low': 0, 'medium': 0, 'high': 0, 'critical': 0}
+        self.by_category: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._occurrences)
+
+    def add(self, resource: Resource) -> bool:
+        """Fold a resource in; returns True the first time its key is seen"""
+        key = resource.key
+        if key in self._occurrences:
+            self._occurrences[key] += resource.occurrences
+            return False
+
+        self._occurrences[key] = resource.occurrences
+        if self.keep_resources:
+            self._resources[key] = resource
+        self._hosts.add(resource.host)
+        self.by_type[resource.type] = self.by_type.get(resource.type, 0) + 1
+        self.by_risk[resource.risk_level] = self.by_risk.get(resource.risk_level, 0) + 1
+        self.by_category[resource.category] = self.by_category.get(resource.category, 0) + 1
+        return True
+
+    def resources(self) -> List[Dict[str, Any]]:
+        """Kept resources as API records, with occurrences summed over all sightings"""
+        return [
+            resource.as_dict(self._occurrences[key])
+            for key, resource in self._resources.items()
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'total_resources': len(self._occurrences),
+            'by_type': dict(self.by_type),
+            'by_risk': dict(self.by_risk),
+            'by_category': dict(self.by_category),
+            'unique_hosts': len(self._hosts)
+        }
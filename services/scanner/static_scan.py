@@ -0,0 +1,292 @@
+"""
+Static Scan - HTTP-only fast path that finds third parties in server-rendered HTML
+Streams the page through an incremental HTML tokenizer and decides whether a browser is needed
+"""
+
+import codecs
+import hashlib
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+import httpx
+
+from constants import USER_AGENT
+
+# <link rel> values that make the browser fetch or connect to something
+LOADING_LINK_RELS = {
+    'stylesheet', 'preload', 'modulepreload', 'prefetch', 'preconnect', 'dns-prefetch',
+    'icon', 'shortcut', 'apple-touch-icon',
+}
+
+# Element ids frameworks mount client-rendered apps into
+SPA_MOUNT_IDS = {'root', 'app', '__next', '__nuxt', '___gatsby', 'svelte', 'ember-app'}
+
+# Scripts that inject further third parties at runtime, invisible to a static scan
+TAG_MANAGER_MARKERS = (
+    'googletagmanager.com/gtm.js', 'googletagmanager.com/gtag/js', 'segment.com/analytics.js',
+    'cdn.segment.com', 'tealiumiq.com', 'ensighten.com',
+)
+
+# <script type> values that hold executable JavaScript (JSON-LD and templates are skipped)
+INLINE_SCRIPT_TYPES = {'', 'text/javascript', 'application/javascript', 'module'}
+
+# Inline script snippets that load trackers at runtime (generic script injection
+# and the standard loaders of common pixels and analytics tags)
+INLINE_LOADER_PATTERN = re.compile(
+    r"createElement\(\s*['\"]script['\"]\s*\)"
+    r"|\bfbq\s*\(|\bgtag\s*\(|\b_paq\b|\b_hsq\b|\bdataLayer\.push\b"
+    r"|\bttq\.|\bsnaptr\s*\(|\bpintrk\s*\(|\b_linkedin_partner_id\b|\bhj\s*\(|\bclarity\s*\(",
+    re.IGNORECASE
+)
+
+# Visible text below which a page with scripts is assumed to render on the client
+MIN_SERVER_RENDERED_TEXT = 200
+SPA_MAX_SERVER_RENDERED_TEXT = 1000
+
+
+@dataclass
+class StaticPage:
+    url: str
+    status_code: int = 0
+    content_type: str = ''
+    scripts: List[str] = field(default_factory=list)
+    images: List[Dict] = field(default_factory=list)
+    iframes: List[str] = field(default_factory=list)
+    link_resources: List[Dict] = field(default_factory=list)
+    links: List[str] = field(default_factory=list)
+    cookies: List[Dict] = field(default_factory=list)
+    text_chars: int = 0
+    spa_mount: bool = False
+    noscript_js_required: bool = False
+    # An inline <script> that injects further scripts or calls a tracker loader
+    inline_loader: bool = False
+    truncated: bool = False
+    # Cache validators and body hash, used by incremental rescans
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    not_modified: bool = False
+    error: Optional[str] = None
+
+    def dom(self) -> Dict[str, List]:
+        """Findings in the same shape as the browser's DOM extraction"""
+        return {
+            'scripts': self.scripts,
+            'images': self.images,
+            'iframes': self.iframes,
+            'links': self.links,
+        }
+
+
+def _dimension(value: Optional[str]) -> Optional[int]:
+    try:
+        return int((value or '').strip().rstrip('px'))
+    except ValueError:
+        return None
+
+
+class ResourceExtractor(HTMLParser):
+    """Incremental tokenizer collecting resource URLs; fed chunk by chunk as the body streams in"""
+
+    def __init__(self, page: StaticPage):
+        super().__init__(convert_charrefs=True)
+        self.page = page
+        self.base_url = page.url
+        self._skip_text_depth = 0
+        self._in_noscript = False
+        self._in_inline_script = False
+        # Tail of the previous chunk of inline script text, so a loader call split across chunks still matches
+        self._inline_tail = ''
+        # Recent <noscript> text, so a message split across chunks still matches
+        self._noscript_text = ''
+
+    def _resolve(self, value: Optional[str]) -> Optional[str]:
+        if not value:
+            return None
+        value = value.strip()
+        if value.startswith(('data:', 'javascript:', 'mailto:', 'tel:', '#', 'about:')):
+            return None
+        return urljoin(self.base_url, value)
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        page = self.page
+
+        if tag in ('script', 'style', 'template'):
+            self._skip_text_depth += 1
+        if tag == 'noscript':
+            self._in_noscript = True
+            self._noscript_text = ''
+        if attrs.get('id') in SPA_MOUNT_IDS or 'ng-app' in attrs or 'data-reactroot' in attrs:
+            page.spa_mount = True
+
+        if tag == 'base' and attrs.get('href'):
+            self.base_url = urljoin(page.url, attrs['href'])
+        elif tag == 'script':
+            src = self._resolve(attrs.get('src'))
+            if src:
+                page.scripts.append(src)
+            elif (attrs.get('type') or 'text/javascript').lower() in INLINE_SCRIPT_TYPES:
+                self._in_inline_script = True
+                self._inline_tail = ''
+        elif tag == 'img':
+            src = self._resolve(attrs.get('src'))
+            if src:
+                page.images.append({
+                    'src': src,
+                    'declaredWidth': _dimension(attrs.get('width')),
+                    'declaredHeight': _dimension(attrs.get('height')),
+                })
+        elif tag == 'iframe':
+            src = self._resolve(attrs.get('src'))
+            if src:
+                page.iframes.append(src)
+        elif tag == 'link':
+            rels = set((attrs.get('rel') or '').lower().split())
+            href = self._resolve(attrs.get('href'))
+            if href and rels & LOADING_LINK_RELS:
+                page.link_resources.append({'href': href, 'rel': ' '.join(sorted(rels)), 'as': attrs.get('as')})
+        elif tag == 'a':
+            href = self._resolve(attrs.get('href'))
+            if href:
+                page.links.append(href)
+
+    def handle_endtag(self, tag):
+        if tag in ('script', 'style', 'template'):
+            self._skip_text_depth = max(0, self._skip_text_depth - 1)
+            if tag == 'script':
+                self._in_inline_script = False
+        elif tag == 'noscript':
+            self._in_noscript = False
+
+    def handle_data(self, data):
+        if self._in_inline_script:
+            if not self.page.inline_loader:
+                text = self._inline_tail + data
+                if INLINE_LOADER_PATTERN.search(text):
+                    self.page.inline_loader = True
+                self._inline_tail = text[-64:]
+            return
+        if self._in_noscript:
+            if not self.page.noscript_js_required:
+                text = self._noscript_text + data.lower()
+                if 'javascript' in text and ('enable' in text or 'require' in text):
+                    self.page.noscript_js_required = True
+                self._noscript_text = text[-256:]
+            return
+        if not self._skip_text_depth:
+            self.page.text_chars += len(data.strip())
+
+
+def _parse_set_cookie(header: str, host: str) -> Dict[str, str]:
+    name = header.split('=', 1)[0].strip()
+    domain = host
+    for attribute in header.split(';')[1:]:
+        key, _, value = attribute.strip().partition('=')
+        if key.lower() == 'domain' and value:
+            domain = value.strip()
+    return {'name': name, 'domain': domain.lstrip('.').lower()}
+
+
+def browser_escalation_reasons(page: StaticPage) -> List[str]:
+    """Heuristics for pages whose third parties only appear once JavaScript runs"""
+    reasons = []
+    if page.error:
+        reasons.append(f"static fetch failed: {page.error}")
+        return reasons
+    if page.status_code >= 400:
+        reasons.append(f"HTTP {page.status_code}")
+    if 'html' not in page.content_type:
+        reasons.append(f"non-HTML response ({page.content_type or 'no content type'})")
+        return reasons
+    if page.scripts and page.text_chars < MIN_SERVER_RENDERED_TEXT:
+        reasons.append('little server-rendered text')
+    if page.spa_mount and page.text_chars < SPA_MAX_SERVER_RENDERED_TEXT:
+        reasons.append('client-side app mount point')
+    if page.noscript_js_required:
+        reasons.append('page requires JavaScript')
+    if any(marker in script for script in page.scripts for marker in TAG_MANAGER_MARKERS):
+        reasons.append('tag manager injects scripts at runtime')
+    if page.inline_loader:
+        reasons.append('inline script loads trackers at runtime')
+    return reasons
+
+
+class StaticFetcher:
+    """Shared httpx client for static page fetches"""
+
+    def __init__(self, max_body_bytes: int = 2 * 1024 * 1024, max_connections: int = 100):
+        self.max_body_bytes = max_body_bytes
+        self.max_connections = max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                follow_redirects=True,
+                headers={'User-Agent': USER_AGENT, 'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.8'},
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=20),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch(
+        self,
+        url: str,
+        timeout: float = 15.0,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> StaticPage:
+        """
+        Fetch and tokenize a page, stopping after max_body_bytes
+
+        With ``etag``/``last_modified`` the request is conditional; a 304 sets
+        ``not_modified`` and leaves the page's findings empty.
+        """
+        page = StaticPage(url=url)
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        try:
+            async with self.client.stream('GET', url, timeout=timeout, headers=headers) as response:
+                page.url = str(response.url)
+                page.status_code = response.status_code
+                page.content_type = response.headers.get('content-type', '').lower()
+                page.etag = response.headers.get('etag')
+                page.last_modified = response.headers.get('last-modified')
+                host = response.url.host
+                page.cookies = [_parse_set_cookie(h, host) for h in response.headers.get_list('set-cookie')]
+                if response.status_code == 304:
+                    page.not_modified = True
+                    return page
+                if 'html' not in page.content_type:
+                    return page
+
+                extractor = ResourceExtractor(page)
+                decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+                digest = hashlib.sha256()
+                received = 0
+                async for chunk in response.aiter_bytes():
+                    digest.update(chunk)
+                    extractor.feed(decoder.decode(chunk))
+                    received += len(chunk)
+                    if received >= self.max_body_bytes:
+                        page.truncated = True
+                        break
+                extractor.feed(decoder.decode(b'', final=True))
+                extractor.close()
+                page.content_hash = digest.hexdigest()
+        except (httpx.HTTPError, UnicodeDecodeError, LookupError) as e:
+            page.error = str(e) or e.__class__.__name__
+        return page
+
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, AdmissionRejected, REJECT_QUEUE_FULL, REJECT_TIMEOUT
+
+
+async def hold(admission, host, release):
+    async with admission.slot(host):
+        await release.wait()
+
+
+def test_rejects_when_queue_is_full():
+    async def run():
+        admission = AdmissionController(max_concurrent=1, max_waiting=1, max_wait=5)
+        release = asyncio.Event()
+        running = asyncio.create_task(hold(admission, 'a.example', release))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(hold(admission, 'b.example', release))
+        await asyncio.sleep(0)
+        assert admission.stats()['waiting'] == 1
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with admission.slot('c.example'):
+                pass
+        assert rejected.value.reason == REJECT_QUEUE_FULL
+
+        release.set()
+        await asyncio.gather(running, waiting)
+        stats = admission.stats()
+        assert stats['admitted'] == 2
+        assert stats['rejected'][REJECT_QUEUE_FULL] == 1
+
+    asyncio.run(run())
+
+
+def test_rejects_after_max_wait():
+    async def run():
+        admission = AdmissionController(max_concurrent=1, max_wait=0.05)
+        release = asyncio.Event()
+        running = asyncio.create_task(hold(admission, 'a.example', release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with admission.slot('b.example'):
+                pass
+        assert rejected.value.reason == REJECT_TIMEOUT
+        assert admission.stats()['waiting'] == 0
+
+        release.set()
+        await running
+
+    asyncio.run(run())
+
+
+def test_retry_after_scales_with_queue_and_scan_time():
+    admission = AdmissionController(max_concurrent=2)
+    admission._avg_scan_seconds = 10.0
+    assert admission.retry_after() == 10
+    admission._waiting = 3
+    assert admission.retry_after() == 20
+    admission._avg_scan_seconds = 1000.0
+    assert admission.retry_after() == 300
+    admission._avg_scan_seconds = 0.01
+    assert admission.retry_after() == 1
+
+
+def test_per_host_limit_does_not_block_other_hosts():
+    async def run():
+        admission = AdmissionController(max_concurrent=4, max_per_host=1, max_wait=0.05)
+        release = asyncio.Event()
+        running = asyncio.create_task(hold(admission, 'a.example', release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected):
+            async with admission.slot('a.example'):
+                pass
+        async with admission.slot('b.example'):
+            assert admission.stats()['running'] == 2
+
+        release.set()
+        await running
+        assert admission.stats()['running'] == 0
+
+    asyncio.run(run())
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from crawler import crawl, normalize_url
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('HTTPS://Example.COM', 'https://example.com/'),
+    ('https://example.com.:443/a', 'https://example.com/a'),
+    ('http://example.com:8080/a', 'http://example.com:8080/a'),
+    ('https://example.com/a#section', 'https://example.com/a'),
+    ('https://example.com/?b=2&a=1', 'https://example.com/?a=1&b=2'),
+    ('https://example.com/?utm_source=x&id=7&fbclid=y&gclid=z', 'https://example.com/?id=7'),
+    ('https://example.com/?q=', 'https://example.com/?q='),
+])
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected
+
+
+def test_normalize_url_resolves_relative_links():
+    assert normalize_url('../b?x=1#top', 'https://example.com/a/page') == 'https://example.com/b?x=1'
+
+
+@pytest.mark.parametrize('url', ['mailto:a@example.com', 'javascript:void(0)', 'ftp://example.com/', 'https://', 'http://example.com:99999/'])
+def test_normalize_url_rejects_non_http(url):
+    assert normalize_url(url) is None
+
+
+def test_crawl_dedupes_and_stays_on_site():
+    async def run():
+        visited = []
+        links = {
+            'https://example.com/': [
+                '/a', '/a#top', '/a?utm_campaign=x', 'https://EXAMPLE.com/a',
+                'https://www.example.com/b', 'https://other.test/', '/file.pdf',
+            ],
+            'https://example.com/a': ['/', '/b'],
+            'https://www.example.com/b': ['https://example.com/a?utm_source=b'],
+        }
+
+        async def scan(url):
+            visited.append(url)
+            return [], links.get(url, [])
+
+        result = await crawl('https://example.com', scan, depth=3)
+        return visited, result
+
+    visited, result = asyncio.run(run())
+    assert visited == ['https://example.com/', 'https://example.com/a', 'https://www.example.com/b', 'https://example.com/b']
+    assert result.pages_scanned == 4
+    assert not result.truncated
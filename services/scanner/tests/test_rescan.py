@@ -0,0 +1,59 @@
+from rescan import RescanTracker, diff_resources, hash_strings
+from scan_summary import Resource
+
+
+def resource(host, url, risk='medium', **fields):
+    return {
+        'host': host, 'type': 'script', 'url': url, 'risk_level': risk,
+        'description': 'Script from ' + host, 'category': 'script', 'occurrences': 1, **fields,
+    }
+
+
+def test_diff_resources():
+    kept = resource('cdn.test', 'https://cdn.test/a.js')
+    dropped = resource('old.test', 'https://old.test/t.js')
+    before_risk = resource('ads.test', 'https://ads.test/x.js', risk='medium')
+    after_risk = resource('ads.test', 'https://ads.test/x.js', risk='high')
+    added = resource('new.test', 'https://new.test/t.js')
+
+    delta = diff_resources([kept, dropped, before_risk], [kept, after_risk, added])
+
+    assert delta['added'] == [added]
+    assert delta['removed'] == [dropped]
+    assert delta['changed'] == [{'before': before_risk, 'after': after_risk}]
+
+
+def test_diff_resources_ignores_occurrence_counts():
+    before = resource('cdn.test', 'https://cdn.test/a.js', occurrences=1)
+    after = resource('cdn.test', 'https://cdn.test/a.js', occurrences=5)
+    assert diff_resources([before], [after]) == {'added': [], 'removed': [], 'changed': []}
+
+
+def test_same_host_and_url_with_different_type_are_distinct():
+    script = resource('t.test', 'https://t.test/p')
+    pixel = dict(script, type='pixel')
+    delta = diff_resources([script], [pixel])
+    assert delta['added'] == [pixel]
+    assert delta['removed'] == [script]
+
+
+def test_hash_strings_is_order_independent():
+    assert hash_strings(['b', 'a', 'a']) == hash_strings(['a', 'b'])
+    assert hash_strings(['a']) != hash_strings(['a', 'b'])
+
+
+def test_failed_page_keeps_its_baseline_record():
+    page_resource = Resource('t.test', 'script', 'https://t.test/t.js', 'medium', 'Script from t.test', 'script')
+    first = RescanTracker()
+    first.record('https://site.test/', [page_resource], [])
+    result = {'scan_id': 'one', 'timestamp': '2024-01-01T00:00:00'}
+    baseline = first.fingerprint(result, [page_resource.as_dict()])
+
+    rescan = RescanTracker(baseline)
+    assert rescan.fail('https://site.test/') == [page_resource]
+    delta = rescan.delta(rescan.fingerprint(dict(result, scan_id='two'), [page_resource.as_dict()]))
+
+    assert delta['pages_failed'] == ['https://site.test/']
+    assert delta['pages_removed'] == []
+    assert delta['pages_rescanned'] == 0
+    assert delta['removed'] == []
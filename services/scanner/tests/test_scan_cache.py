@@ -0,0 +1,136 @@
+import asyncio
+import os
+import time
+
+from scan_cache import CACHE_COALESCED, CACHE_HIT, CACHE_MISS, CACHE_STALE, ScanCache
+
+
+def test_concurrent_identical_scans_are_coalesced():
+    async def run():
+        cache = ScanCache()
+        calls = []
+        release = asyncio.Event()
+
+        async def scan():
+            calls.append(1)
+            await release.wait()
+            return {'scan_id': 'one'}
+
+        first = asyncio.create_task(cache.get_or_scan('key', scan))
+        second = asyncio.create_task(cache.get_or_scan('key', scan))
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(first, second)
+
+        assert len(calls) == 1
+        assert [outcome for _, outcome in results] == [CACHE_MISS, CACHE_COALESCED]
+        assert results[0][0] is results[1][0]
+        assert await cache.get_or_scan('key', scan) == ({'scan_id': 'one'}, CACHE_HIT)
+
+    asyncio.run(run())
+
+
+def test_stale_entry_is_served_while_refreshing():
+    async def run():
+        cache = ScanCache(ttl=0.01, stale_ttl=60)
+        results = iter([{'scan_id': 'old'}, {'scan_id': 'new'}])
+
+        async def scan():
+            return next(results)
+
+        await cache.get_or_scan('key', scan)
+        await asyncio.sleep(0.02)
+
+        value, outcome = await cache.get_or_scan('key', scan)
+        assert (value['scan_id'], outcome) == ('old', CACHE_STALE)
+        while cache.stats()['in_flight']:
+            await asyncio.sleep(0)
+        assert cache.stats()['refreshes'] == 1
+
+        cache.ttl = 60
+        value, outcome = await cache.get_or_scan('key', scan)
+        assert (value['scan_id'], outcome) == ('new', CACHE_HIT)
+
+    asyncio.run(run())
+
+
+def test_scan_is_cancelled_when_last_waiter_leaves():
+    async def run():
+        cache = ScanCache()
+        cancelled = asyncio.Event()
+
+        async def scan():
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        first = asyncio.create_task(cache.get_or_scan('key', scan))
+        second = asyncio.create_task(cache.get_or_scan('key', scan))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert not cancelled.is_set()
+
+        second.cancel()
+        await asyncio.gather(second, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert cancelled.is_set()
+        assert cache.stats()['abandoned'] == 1
+        assert cache.stats()['in_flight'] == 0
+
+    asyncio.run(run())
+
+
+def test_uncacheable_results_are_not_stored():
+    async def run():
+        cache = ScanCache(cacheable=lambda result: not result['partial'])
+
+        async def scan():
+            return {'partial': True}
+
+        assert (await cache.get_or_scan('key', scan))[1] == CACHE_MISS
+        assert (await cache.get_or_scan('key', scan))[1] == CACHE_MISS
+        assert cache.stats()['uncacheable'] == 2
+        assert cache.stats()['entries'] == 0
+
+    asyncio.run(run())
+
+
+def test_disk_tier_is_bounded_by_max_entries(tmp_path):
+    async def run():
+        cache = ScanCache(max_entries=2, disk_dir=str(tmp_path))
+        for n in range(4):
+            async def scan():
+                return {'scan_id': n}
+            await cache.get_or_scan(f'key{n}', scan)
+            written = time.time() - 10 + n
+            os.utime(cache._disk_path(f'key{n}'), (written, written))
+        return cache
+
+    cache = asyncio.run(run())
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        os.path.basename(cache._disk_path(key)) for key in ('key2', 'key3')
+    )
+    assert cache.stats()['disk_evictions'] == 2
+
+
+def test_expired_disk_entries_are_removed_at_startup(tmp_path):
+    async def run():
+        cache = ScanCache(ttl=60, stale_ttl=60, disk_dir=str(tmp_path))
+
+        async def scan():
+            return {'scan_id': 'old'}
+
+        await cache.get_or_scan('key', scan)
+        return cache._disk_path('key')
+
+    path = asyncio.run(run())
+    expired = time.time() - 121
+    os.utime(path, (expired, expired))
+    cache = ScanCache(ttl=60, stale_ttl=60, disk_dir=str(tmp_path))
+    assert os.listdir(tmp_path) == []
+    assert cache.stats()['disk_evictions'] == 1
@@ -0,0 +1,118 @@
+import asyncio
+import time
+
+import pytest
+
+from scan_store import (
+    MemoryScanStore, SQLiteScanStore, STATUS_COMPLETED, STATUS_FAILED, STATUS_QUEUED, STATUS_RUNNING,
+)
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_store(request, tmp_path):
+    def make():
+        if request.param == 'memory':
+            return MemoryScanStore()
+        return SQLiteScanStore(str(tmp_path / 'scans.db'))
+    return make
+
+
+def record(scan_id, status, **fields):
+    return {'scan_id': scan_id, 'status': status, 'updated_at': time.time(), **fields}
+
+
+def test_put_get_and_update(make_store):
+    async def run():
+        store = make_store()
+        await store.put('a', record('a', STATUS_QUEUED))
+        assert (await store.get('a'))['status'] == STATUS_QUEUED
+        assert (await store.update('a', status=STATUS_COMPLETED, result={'ok': True}))['result'] == {'ok': True}
+        assert (await store.get('a'))['status'] == STATUS_COMPLETED
+        assert await store.get('missing') is None
+        assert await store.update('missing', status=STATUS_FAILED) is None
+        await store.close()
+
+    asyncio.run(run())
+
+
+def test_fail_unfinished_only_touches_queued_and_running(make_store):
+    async def run():
+        store = make_store()
+        await store.put('queued', record('queued', STATUS_QUEUED))
+        await store.put('running', record('running', STATUS_RUNNING))
+        await store.put('done', record('done', STATUS_COMPLETED))
+
+        assert sorted(await store.fail_unfinished('restarted')) == ['queued', 'running']
+        for scan_id in ('queued', 'running'):
+            failed = await store.get(scan_id)
+            assert (failed['status'], failed['error']) == (STATUS_FAILED, 'restarted')
+        assert (await store.get('done'))['status'] == STATUS_COMPLETED
+        assert await store.fail_unfinished('restarted') == []
+        await store.close()
+
+    asyncio.run(run())
+
+
+def test_fingerprints(make_store):
+    async def run():
+        store = make_store()
+        assert await store.get_fingerprint('site') is None
+        await store.put_fingerprint('site', {'scan_id': 'a'})
+        await store.put_fingerprint('site', {'scan_id': 'b'})
+        assert await store.get_fingerprint('site') == {'scan_id': 'b'}
+        await store.close()
+
+    asyncio.run(run())
+
+
+def test_memory_store_keeps_most_recent_records():
+    async def run():
+        store = MemoryScanStore(max_records=2)
+        for scan_id in ('a', 'b', 'c'):
+            await store.put(scan_id, record(scan_id, STATUS_COMPLETED))
+        assert await store.get('a') is None
+        assert await store.get('c') is not None
+
+    asyncio.run(run())
+
+
+def test_sqlite_records_survive_a_restart(tmp_path):
+    async def run():
+        path = str(tmp_path / 'scans.db')
+        store = SQLiteScanStore(path)
+        await store.put('a', record('a', STATUS_RUNNING))
+        await store.close()
+
+        store = SQLiteScanStore(path)
+        assert await store.fail_unfinished('restarted') == ['a']
+        assert (await store.get('a'))['status'] == STATUS_FAILED
+        await store.close()
+
+    asyncio.run(run())
+
+
+def test_sqlite_purges_expired_rows_while_running(tmp_path):
+    async def run():
+        store = SQLiteScanStore(str(tmp_path / 'scans.db'), ttl_seconds=60, purge_every=2)
+        await store.put('old', record('old', STATUS_COMPLETED, updated_at=time.time() - 120))
+        assert await store.get('old') is not None
+        await store.put('new', record('new', STATUS_COMPLETED))
+        assert await store.get('old') is None
+        assert await store.get('new') is not None
+        await store.close()
+
+    asyncio.run(run())
+
+
+def test_sqlite_purges_expired_rows_at_startup(tmp_path):
+    async def run():
+        path = str(tmp_path / 'scans.db')
+        store = SQLiteScanStore(path)
+        await store.put('old', record('old', STATUS_COMPLETED, updated_at=time.time() - 120))
+        await store.close()
+
+        store = SQLiteScanStore(path, ttl_seconds=60)
+        assert await store.get('old') is None
+        await store.close()
+
+    asyncio.run(run())
@@ -0,0 +1,111 @@
+import pytest
+
+from static_scan import (
+    MIN_SERVER_RENDERED_TEXT, ResourceExtractor, StaticPage, _dimension, _parse_set_cookie,
+    browser_escalation_reasons,
+)
+
+TEXT = '<p>' + 'Server rendered copy. ' * 20 + '</p>'
+
+
+def extract(html, chunk_size=7, url='https://site.test/dir/page'):
+    """Tokenize html the way StaticFetcher does, in small streamed chunks"""
+    page = StaticPage(url=url, status_code=200, content_type='text/html; charset=utf-8')
+    extractor = ResourceExtractor(page)
+    for start in range(0, len(html), chunk_size):
+        extractor.feed(html[start:start + chunk_size])
+    extractor.close()
+    return page
+
+
+def test_extracts_resources_and_links():
+    page = extract(
+        '<html><head><base href="https://site.test/base/">'
+        '<script src="https://cdn.test/lib.js"></script>'
+        '<link rel="preconnect" href="https://fonts.test">'
+        '<link rel="canonical" href="https://site.test/">'
+        '</head><body>'
+        '<img src="/p.gif" width="1" height="1px"><img src="data:image/gif;base64,R0lG">'
+        '<iframe src="https://embed.test/frame"></iframe>'
+        '<a href="next">next</a><a href="mailto:a@site.test">mail</a>'
+        '</body></html>'
+    )
+    assert page.scripts == ['https://cdn.test/lib.js']
+    assert page.images == [{'src': 'https://site.test/p.gif', 'declaredWidth': 1, 'declaredHeight': 1}]
+    assert page.iframes == ['https://embed.test/frame']
+    assert page.link_resources == [{'href': 'https://fonts.test', 'rel': 'preconnect', 'as': None}]
+    assert page.links == ['https://site.test/base/next']
+
+
+def test_text_outside_scripts_and_styles_is_counted():
+    page = extract('<style>body { color: red }</style><script>var x = 1;</script><p>hello world</p>', chunk_size=4096)
+    assert page.text_chars == len('hello world')
+
+
+def test_loader_split_across_chunks_is_detected():
+    html = "<script>(function(){var s=document.createElement('script');s.src='//t.test/t.js';})();</script>"
+    for chunk_size in (1, 3, 7, 64):
+        assert extract(html, chunk_size).inline_loader
+
+
+@pytest.mark.parametrize('script', [
+    "fbq('init', '123');",
+    "window.dataLayer = window.dataLayer || []; dataLayer.push({event: 'x'});",
+    "gtag('config', 'G-1');",
+    "var _paq = window._paq || [];",
+])
+def test_common_loaders_are_detected(script):
+    assert extract(f'<script>{script}</script>').inline_loader
+
+
+@pytest.mark.parametrize('script_type', ['application/ld+json', 'text/template', 'text/x-handlebars'])
+def test_non_javascript_scripts_are_ignored(script_type):
+    page = extract(f'<script type="{script_type}">{{"code": "fbq(1); gtag(2); document.createElement(\'script\')"}}</script>')
+    assert not page.inline_loader
+
+
+def test_loader_text_outside_scripts_is_ignored():
+    assert not extract('<p>Call gtag( and fbq( to load tags</p><script>var a = 1;</script>').inline_loader
+
+
+@pytest.mark.parametrize('value, expected', [('1', 1), (' 300px ', 300), (None, None), ('auto', None), ('50%', None)])
+def test_dimension(value, expected):
+    assert _dimension(value) == expected
+
+
+@pytest.mark.parametrize('header, cookie', [
+    ('sid=abc; Path=/; HttpOnly', {'name': 'sid', 'domain': 'site.test'}),
+    ('_ga=GA1.2; Domain=.Site.Test; Max-Age=60', {'name': '_ga', 'domain': 'site.test'}),
+    ('pref=1; domain=', {'name': 'pref', 'domain': 'site.test'}),
+])
+def test_parse_set_cookie(header, cookie):
+    assert _parse_set_cookie(header, 'site.test') == cookie
+
+
+def test_server_rendered_page_needs_no_browser():
+    page = extract(f'<script src="https://cdn.test/lib.js"></script>{TEXT}')
+    assert page.text_chars >= MIN_SERVER_RENDERED_TEXT
+    assert browser_escalation_reasons(page) == []
+
+
+@pytest.mark.parametrize('html, reason', [
+    ('<script src="/app.js"></script><p>Loading</p>', 'little server-rendered text'),
+    (f'<div id="__next">{TEXT}</div>', 'client-side app mount point'),
+    (f'<noscript>You need to enable JavaScript to run this app.</noscript>{TEXT}', 'page requires JavaScript'),
+    (f'<script src="https://www.googletagmanager.com/gtm.js?id=GTM-1"></script>{TEXT}', 'tag manager injects scripts at runtime'),
+    (f"<script>fbq('track', 'PageView');</script>{TEXT}", 'inline script loads trackers at runtime'),
+])
+def test_escalation_reasons(html, reason):
+    assert browser_escalation_reasons(extract(html)) == [reason]
+
+
+def test_failed_and_non_html_responses_escalate():
+    assert browser_escalation_reasons(StaticPage(url='https://site.test/', error='timed out')) == [
+        'static fetch failed: timed out'
+    ]
+    assert browser_escalation_reasons(StaticPage(url='https://site.test/', status_code=200, content_type='application/pdf')) == [
+        'non-HTML response (application/pdf)'
+    ]
+    page = extract(TEXT)
+    page.status_code = 403
+    assert browser_escalation_reasons(page) == ['HTTP 403']
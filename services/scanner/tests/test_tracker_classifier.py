@@ -0,0 +1,56 @@
+import pytest
+
+from tracker_classifier import KNOWN_TRACKERS, TrackerClassifier, normalize_host
+
+
+@pytest.fixture
+def classifier():
+    return TrackerClassifier(KNOWN_TRACKERS)
+
+
+@pytest.mark.parametrize('host, matched', [
+    ('facebook.com', 'facebook.com'),
+    ('www.facebook.com', 'facebook.com'),
+    ('connect.facebook.net', 'facebook.net'),
+    ('cdnjs.cloudflare.com', 'cdnjs.cloudflare.com'),
+    ('api.cloudflare.com', 'cloudflare.com'),
+    ('notfacebook.com', None),
+    ('facebook.com.evil.test', None),
+    ('com', None),
+])
+def test_matches_on_label_boundaries(classifier, host, matched):
+    assert classifier.classify(host, 'script').matched_domain == matched
+
+
+def test_most_specific_entry_wins(classifier):
+    assert classifier.lookup('cdnjs.cloudflare.com')['type'] == 'cdn'
+    classifier.add('cdnjs.cloudflare.com', {'type': 'library', 'risk': 'low', 'category': 'ui'})
+    assert classifier.classify('x.cdnjs.cloudflare.com', 'script').type == 'library'
+    assert classifier.classify('x.cloudflare.com', 'script').type == 'cdn'
+
+
+def test_unlisted_host_uses_resource_defaults(classifier):
+    classification = classifier.classify('notfacebook.com', 'pixel')
+    assert (classification.risk, classification.type, classification.category) == ('medium', 'pixel', 'tracking')
+
+
+@pytest.mark.parametrize('host, expected', [
+    ('www.facebook.com', 'www.facebook.com'),
+    ('WWW.Facebook.COM.', 'www.facebook.com'),
+    ('.facebook.com', 'facebook.com'),
+    ('user@facebook.com:443', 'facebook.com'),
+    ('', ''),
+])
+def test_normalize_host(host, expected):
+    assert normalize_host(host) == expected
+
+
+def test_external_lists_do_not_override_builtin_entries(classifier):
+    added = classifier.add_many(
+        [('facebook.com', {'type': 'tracker', 'risk': 'high', 'category': 'tracking'}),
+         ('tracker.test', {'type': 'tracker', 'risk': 'high', 'category': 'tracking'})],
+        overwrite=False
+    )
+    assert added == 1
+    assert classifier.lookup('facebook.com')['risk'] == 'medium'
+    assert classifier.lookup('pixel.tracker.test')['risk'] == 'high'
@@ -0,0 +1,243 @@
+"""
+Tracker Classifier - indexed lookup of known tracker domains
+Matches hosts on label boundaries against a suffix index and memoizes results per host
+"""
+
+import json
+from collections import namedtuple
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+# Known tracker/analytics domains
+KNOWN_TRACKERS = {
+    'google-analytics.com': {'type': 'analytics', 'risk': 'low', 'category': 'analytics'},
+    'googletagmanager.com': {'type': 'tag_manager', 'risk': 'low', 'category': 'analytics'},
+    'doubleclick.net': {'type': 'advertising', 'risk': 'medium', 'category': 'advertising'},
+    'facebook.net': {'type': 'social_tracking', 'risk': 'medium', 'category': 'social'},
+    'facebook.com': {'type': 'social_tracking', 'risk': 'medium', 'category': 'social'},
+    'twitter.com': {'type': 'social_tracking', 'risk': 'medium', 'category': 'social'},
+    'linkedin.com': {'type': 'social_tracking', 'risk': 'medium', 'category': 'social'},
+    'hotjar.com': {'type': 'heat_mapping', 'risk': 'medium', 'category': 'analytics'},
+    'mixpanel.com': {'type': 'analytics', 'risk': 'low', 'category': 'analytics'},
+    'segment.com': {'type': 'analytics', 'risk': 'low', 'category': 'analytics'},
+    'intercom.io': {'type': 'chat', 'risk': 'low', 'category': 'customer_support'},
+    'zendesk.com': {'type': 'chat', 'risk': 'low', 'category': 'customer_support'},
+    'cloudflare.com': {'type': 'cdn', 'risk': 'low', 'category': 'infrastructure'},
+    'amazonaws.com': {'type': 'cdn', 'risk': 'low', 'category': 'infrastructure'},
+    'cdnjs.cloudflare.com': {'type': 'cdn', 'risk': 'low', 'category': 'infrastructure'},
+    'fonts.googleapis.com': {'type': 'fonts', 'risk': 'low', 'category': 'ui'},
+    'fonts.gstatic.com': {'type': 'fonts', 'risk': 'low', 'category': 'ui'},
+    'youtube.com': {'type': 'video', 'risk': 'medium', 'category': 'media'},
+    'youtu.be': {'type': 'video', 'risk': 'medium', 'category': 'media'},
+    'vimeo.com': {'type': 'video', 'risk': 'medium', 'category': 'media'},
+    'wistia.com': {'type': 'video', 'risk': 'medium', 'category': 'media'},
+    'stripe.com': {'type': 'payment', 'risk': 'low', 'category': 'payments'},
+    'paypal.com': {'type': 'payment', 'risk': 'low', 'category': 'payments'},
+    'braintreepayments.com': {'type': 'payment', 'risk': 'low', 'category': 'payments'},
+    'recaptcha.net': {'type': 'security', 'risk': 'low', 'category': 'security'},
+    'hcaptcha.com': {'type': 'security', 'risk': 'low', 'category': 'security'},
+}
+
+# Classification applied to entries loaded from plain block lists (EasyPrivacy, hosts files)
+DEFAULT_LIST_ENTRY = {'type': 'tracker', 'risk': 'medium', 'category': 'tracking'}
+
+# Disconnect services.json categories mapped onto our own taxonomy
+DISCONNECT_CATEGORIES = {
+    'Advertising': {'type': 'advertising', 'risk': 'medium', 'category': 'advertising'},
+    'Analytics': {'type': 'analytics', 'risk': 'low', 'category': 'analytics'},
+    'Social': {'type': 'social_tracking', 'risk': 'medium', 'category': 'social'},
+    'Content': {'type': 'content', 'risk': 'low', 'category': 'media'},
+    'Fingerprinting': {'type': 'fingerprinting', 'risk': 'high', 'category': 'tracking'},
+    'FingerprintingGeneral': {'type': 'fingerprinting', 'risk': 'high', 'category': 'tracking'},
+    'FingerprintingInvasive': {'type': 'fingerprinting', 'risk': 'high', 'category': 'tracking'},
+    'Cryptomining': {'type': 'cryptomining', 'risk': 'critical', 'category': 'security'},
+}
+
+Classification = namedtuple('Classification', ['risk', 'type', 'category', 'matched_domain'])
+
+
+def normalize_host(host: str) -> str:
+    """Lowercase a host and strip cookie dots, trailing dots, credentials and port"""
+    if host.islower() and host.isprintable() and ' ' not in host and '@' not in host and ':' not in host \
+            and host[0] != '.' and host[-1] != '.':
+        # Already a bare lowercase host, as extract_domain() returns for most URLs
+        return host
+    host = host.strip().lower()
+    if '@' in host:
+        host = host.rsplit('@', 1)[1]
+    if host.startswith('['):
+        return host.split(']', 1)[0] + ']'
+    if ':' in host:
+        host = host.split(':', 1)[0]
+    return host.strip('.')
+
+
+def default_risk(resource_type: str) -> str:
+    """Risk level for hosts that are not in any tracker list"""
+    if resource_type in ['script', 'iframe']:
+        # External scripts are medium risk by default
+        return 'medium'
+    elif resource_type == 'cookie':
+        # Cookies depend on type - we'll assess this when we have more info
+        return 'low'
+    elif resource_type == 'pixel':
+        # Tracking pixels are typically medium-high risk
+        return 'medium'
+    else:
+        return 'low'
+
+
+def default_category(resource_type: str) -> str:
+    """Category for hosts that are not in any tracker list"""
+    if resource_type == 'script':
+        return 'script'
+    elif resource_type == 'cookie':
+        return 'cookie'
+    elif resource_type == 'pixel':
+        return 'tracking'
+    else:
+        return 'general'
+
+
+@lru_cache(maxsize=None)
+def _unlisted_classification(resource_type: str) -> Classification:
+    return Classification(
+        risk=default_risk(resource_type),
+        type=resource_type,
+        category=default_category(resource_type),
+        matched_domain=None
+    )
+
+
+class TrackerClassifier:
+    """
+    Classify hosts against known tracker domains.
+
+    Domains are stored in a suffix index keyed on whole registrable suffixes,
+    so a lookup walks the host's labels from the TLD inwards and costs one
+    dict probe per label regardless of list size. The most specific match
+    wins, and matches only happen on label boundaries (``notfacebook.com``
+    does not match ``facebook.com``). Results are memoized per host and
+    resource type, since pages request the same hosts over and over.
+    """
+
+    def __init__(self, trackers: Optional[Dict[str, Dict[str, str]]] = None, cache_size: int = 65536):
+        self._index: Dict[str, Dict[str, str]] = {}
+        self._cache_size = cache_size
+        self._classify = lru_cache(maxsize=cache_size)(self._classify_uncached)
+        if trackers:
+            self.add_many(trackers.items())
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def add(self, domain: str, info: Dict[str, str], overwrite: bool = True) -> None:
+        """Add a single domain to the index"""
+        domain = normalize_host(domain)
+        if not domain or (not overwrite and domain in self._index):
+            return
+        self._index[domain] = info
+        self._classify.cache_clear()
+
+    def add_many(self, entries: Iterable[Tuple[str, Dict[str, str]]], overwrite: bool = True) -> int:
+        """Add many domains at once; returns the number of new index entries"""
+        before = len(self._index)
+        index = self._index
+        for domain, info in entries:
+            domain = normalize_host(domain)
+            if domain and (overwrite or domain not in index):
+                index[domain] = info
+        self._classify.cache_clear()
+        return len(self._index) - before
+
+    def _lookup_uncached(self, host: str) -> Optional[Tuple[str, Dict[str, str]]]:
+        index = self._index
+        start = 0
+        # Walk label-boundary suffixes from the full host outwards; the first hit is the most specific
+        while True:
+            suffix = host[start:] if start else host
+            info = index.get(suffix)
+            if info is not None:
+                return suffix, info
+            dot = host.find('.', start)
+            if dot < 0:
+                return None
+            start = dot + 1
+
+    def lookup(self, host: str) -> Optional[Dict[str, str]]:
+        """Return the tracker entry for a host, or None if it is not listed"""
+        match = self._lookup_uncached(normalize_host(host))
+        return match[1] if match else None
+
+    def _classify_uncached(self, host: str, resource_type: str) -> Classification:
+        match = self._lookup_uncached(normalize_host(host))
+        if match is None:
+            return _unlisted_classification(resource_type)
+        domain, info = match
+        return Classification(
+            risk=info['risk'],
+            type=info.get('type', resource_type),
+            category=info.get('category', 'general'),
+            matched_domain=domain
+        )
+
+    def classify(self, host: str, resource_type: str) -> Classification:
+        """Return risk, type and category for a host in a single (memoized) lookup"""
+        return self._classify(host, resource_type)
+
+    def cache_info(self) -> Dict[str, int]:
+        info = self._classify.cache_info()
+        return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'max_size': self._cache_size}
+
+    def load_file(self, path: str) -> int:
+        """
+        Load an external tracker list without overriding built-in entries.
+
+        Supports Disconnect ``services.json`` files, Adblock-style lists such as
+        EasyPrivacy (only plain ``||domain^`` network rules are used) and
+        hosts files or plain one-domain-per-line lists.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            if path.endswith('.json'):
+                return self.add_many(_parse_disconnect(json.load(f)), overwrite=False)
+            return self.add_many(
+                ((domain, DEFAULT_LIST_ENTRY) for domain in _parse_domain_list(f)),
+                overwrite=False
+            )
+
+
+def _parse_disconnect(data: Dict) -> Iterable[Tuple[str, Dict[str, str]]]:
+    """Yield (domain, info) pairs from a Disconnect services.json document"""
+    for category, services in data.get('categories', {}).items():
+        info = DISCONNECT_CATEGORIES.get(category, DEFAULT_LIST_ENTRY)
+        for service in services:
+            for properties in service.values():
+                for key, domains in properties.items():
+                    if isinstance(domains, list):
+                        for domain in domains:
+                            yield domain, info
+
+
+def _parse_domain_list(lines: Iterable[str]) -> Iterable[str]:
+    """Yield domains from Adblock-style filter lists, hosts files or plain lists"""
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] in '!#[':
+            continue
+        if line.startswith('||'):
+            # Only blanket domain rules, e.g. ||tracker.example^ or ||tracker.example^$third-party
+            rule = line[2:]
+            end = rule.find('^')
+            if end <= 0 or any(c in rule[:end] for c in '/*'):
+                continue
+            options = rule[end + 1:]
+            if options and not options.startswith('$'):
+                continue
+            yield rule[:end]
+        elif line.startswith('@@') or any(c in line for c in '/*$|^'):
+            continue
+        else:
+            parts = line.split()
+            domain = parts[1] if len(parts) > 1 and parts[0] in ('0.0.0.0', '127.0.0.1') else parts[0]
+            if '.' in domain:
+                yield domain